@@ -118,7 +118,8 @@ def initialize_amadeus() -> Client:
     amadeus_client = Client(
         client_id=os.getenv('AMADEUS_CLIENT_ID', 'CZ7m9PsAFkhLW59r7W0BkRhLiK34UlaW'),
         client_secret=os.getenv('AMADEUS_CLIENT_SECRET', 'Ex73FGBI9AeOC50M'),
-        log_level="debug"
+        # 'debug' logs every request and full response body, opt in for troubleshooting
+        log_level=os.getenv('AMADEUS_LOG_LEVEL', 'warn')
     )
     
     # Verify that credentials are provided
@@ -143,6 +144,8 @@ def initialize_amadeus() -> Client:
 
 # Valid travel classes as a module-level constant
 VALID_TRAVEL_CLASSES = ['ECONOMY', 'PREMIUM_ECONOMY', 'BUSINESS', 'FIRST']
+# Upper bound on remembered keyword -> IATA code lookups per FlightSearchMCP
+IATA_CACHE_SIZE = 2048
 class FlightSearchMCP:
     """
     A class to handle flight search operations using the Amadeus API.
@@ -162,6 +165,8 @@ class FlightSearchMCP:
         """
         logger.info("Initializing FlightSearchMCP")
         self.client = client or initialize_amadeus()
+        # City/airport keyword lookups, keyed by the normalized keyword
+        self._iata_cache: Dict[Tuple[str, Optional[str], int], List[Dict[str, str]]] = {}
         logger.debug("FlightSearchMCP initialized with client: %s", type(self.client).__name__)
     
     @staticmethod
@@ -325,14 +330,14 @@ class FlightSearchMCP:
                 **params
             )
             
-            logger.debug(f"Amadeus response: {response}")
+            logger.debug("Amadeus response: %s", response)
             
             # Debug the response structure and save to file
             # debug_amadeus_response(response)
             
             # Process the response data
             flights = response.data
-            logger.debug(f"Processed {len(flights) if flights else 0} flights")
+            logger.debug("Processed %d flights", len(flights) if flights else 0)
            
             if not response.data:
                 return []
@@ -430,7 +435,14 @@ class FlightSearchMCP:
         Returns:
             list: A list of dictionaries, where each dictionary contains 'name' and 'iataCode'
                 for matching airports/cities, or an empty list if no results are found.
+
+        Non-empty results are cached per keyword (case and surrounding whitespace
+        ignored), since the city to airport mapping practically never changes.
         """
+        cache_key = (keyword.strip().lower(), country_code, max_results)
+        cached = self._iata_cache.get(cache_key)
+        if cached is not None:
+            return cached
         try:
             params = {
                 'keyword':keyword,
@@ -450,6 +462,11 @@ class FlightSearchMCP:
                         'name': item['name'],
                         'iataCode': item['iataCode']
                     })
+            if iata_codes:
+                if len(self._iata_cache) >= IATA_CACHE_SIZE:
+                    # Drop the oldest entry, dicts keep insertion order
+                    self._iata_cache.pop(next(iter(self._iata_cache)), None)
+                self._iata_cache[cache_key] = iata_codes
             return iata_codes
 
         except ResponseError as error:
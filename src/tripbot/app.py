@@ -7,7 +7,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from starlette.staticfiles import StaticFiles
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.ext.asyncio import async_sessionmaker
@@ -50,12 +50,17 @@ async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database initialized")
+    from tripbot.routes import trip_bot, warm_templates
+    warm_templates()
+    logger.info("Templates compiled")
+    trip_bot.warm_up()
     yield
     # Shutdown: Dispose of the database connection
     await engine.dispose()
     logger.info("Database connection closed")
 
-app = FastAPI(title="TripBot AI Assistant", version="0.1.0", lifespan=lifespan)
+app = FastAPI(title="TripBot AI Assistant", version="0.1.0", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
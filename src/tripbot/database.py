@@ -21,6 +21,9 @@ engine = create_async_engine(
     DATABASE_URL,
     echo=False,  # We'll handle logging ourselves
     connect_args={"check_same_thread": False},
+    # Room for concurrent chat turns without waiting on a connection
+    pool_size=20,
+    max_overflow=40,
     pool_pre_ping=True,
     pool_recycle=3600
 )
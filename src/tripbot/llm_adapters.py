@@ -1,14 +1,23 @@
 import os
+import re
 import json
+import asyncio
 import logging
+import functools
+import hashlib
 import time
-import traceback
-from typing import Any, Dict, List, Optional, Iterator, Mapping, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Iterator, Mapping, Tuple, TypedDict, Union
 from datetime import datetime
 from pydantic import Json
 
 import boto3
+import orjson
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
+
+from cache_utils import TTLCache
 from typing import Final
 
 # Response dictionary keys
@@ -20,12 +29,143 @@ USER_DATA_KEY: Final[str] = "UserData"
 TOOL_CALL_KEY: Final[str] = "tool_call"
 TOOL_PARAMETERS_KEY: Final[str] = "parameters"
 
+# Shape of the parsed bot reply. Parsers fill in only the keys they find.
+BotResponse = TypedDict('BotResponse', {
+    BOT_TEXT_RESPONSE_KEY: Optional[str],
+    QUESTION_KEY: Optional[str],
+    USER_DATA_KEY: Dict[str, Any],
+    TOOL_CALL_KEY: Any,
+    TOOL_PARAMETERS_KEY: Any,
+}, total=False)
+
+# Canonical user-visible error messages. Returned by reference so the error
+# paths don't allocate a new string per failed request.
+_ERR_UNAVAILABLE: Final[str] = "I'm having trouble connecting to the AI service. Please try again later."
+_ERR_TECHNICAL: Final[str] = "I apologize, but I'm experiencing some technical difficulties. Please try again in a moment."
+_ERR_PERMISSION: Final[str] = "I don't have permission to access the language model. Please check your AWS permissions."
+_ERR_NOT_FOUND: Final[str] = "The requested language model was not found. Please check the model ID."
+_ERR_THROTTLED: Final[str] = "The service is currently experiencing high traffic. Please try again in a moment."
+_ERR_MODEL_TEMPLATE: Final[str] = "I encountered an error with the language model: {}"
+
+# Prebuilt error replies for the fixed messages, shared across requests.
+# Callers read these and must not mutate them.
+_UNAVAILABLE_RESPONSE: Final[Dict[str, str]] = {BOT_TEXT_RESPONSE_KEY: _ERR_UNAVAILABLE}
+_TECHNICAL_RESPONSE: Final[Dict[str, str]] = {BOT_TEXT_RESPONSE_KEY: _ERR_TECHNICAL}
+# Bedrock ClientError code -> prebuilt error reply
+_CLIENT_ERROR_RESPONSES: Final[Dict[str, Dict[str, str]]] = {
+    'AccessDeniedException': {BOT_TEXT_RESPONSE_KEY: _ERR_PERMISSION},
+    'ResourceNotFoundException': {BOT_TEXT_RESPONSE_KEY: _ERR_NOT_FOUND},
+    'ThrottlingException': {BOT_TEXT_RESPONSE_KEY: _ERR_THROTTLED},
+}
+
 # Import logging configuration
 from tripbot.config.logging_config import setup_logging
 
 # Initialize logging
 setup_logging()
 logger = logging.getLogger(__name__)
+# Configure the AWS SDK loggers once at import rather than on every client
+# lookup. Quiet by default, TRIPBOT_BOTO_DEBUG turns on wire-level logging.
+_SDK_LOG_LEVEL: Final[int] = logging.DEBUG if os.environ.get('TRIPBOT_BOTO_DEBUG') else logging.ERROR
+for _sdk_logger in ('botocore', 'boto3', 'urllib3'):
+    logging.getLogger(_sdk_logger).setLevel(_SDK_LOG_LEVEL)
+
+# Upper bound on the size, in bytes, of JSON payloads written to debug logs.
+_DEBUG_DUMP_LIMIT: Final[int] = 4096
+# Max items packed into one prompt by generate_response_marshaled. Larger
+# lists are split, the model gets less reliable past this point.
+_MAX_MARSHALED_BATCH: Final[int] = 20
+# Replies shorter than this (in characters) are parsed inline by aparse
+# instead of on a worker thread.
+_INLINE_PARSE_LIMIT: Final[int] = 64 * 1024
+# Phrases that mark a plain-text model reply as a question to the user.
+# TODO: Move this phrases into templates and eventually language specific templates.
+_QUESTION_MARKERS: Final[tuple] = ('?', 'could you', 'would you', 'can you', 'please tell', 'what is', 'when is', 'where is')
+# Single case-insensitive pass over the text instead of lower() plus one scan per marker.
+_QUESTION_RE: Final[re.Pattern] = re.compile('|'.join(map(re.escape, _QUESTION_MARKERS)), re.IGNORECASE)
+
+def _is_question(text: str) -> bool:
+    """Check text for any question marker in a single pass"""
+    # Most questions carry a '?', which a plain substring search finds
+    # without entering the regex engine.
+    return '?' in text or _QUESTION_RE.search(text) is not None
+# Shared decoder for raw_decode, which parses a JSON value embedded in text
+# and reports where it ended in a single pass.
+_JSON_DECODER: Final[json.JSONDecoder] = json.JSONDecoder()
+# How many '{' positions _try_parse_json_prefix tries before giving up
+_JSON_PREFIX_ATTEMPTS: Final[int] = 4
+# Retry replies that are not strict JSON (trailing commas, single quotes)
+# with json5. Off by default: json5 is an optional extra and far slower.
+_LENIENT_JSON: Final[bool] = os.environ.get('TRIPBOT_LENIENT_JSON', '').lower() in ('1', 'true', 'yes')
+# Chat history roles mapped to Bedrock converse roles. Converse only accepts
+# lowercase roles, anything not listed here is not sent to the model.
+_ROLE_MAP: Final[Dict[str, str]] = {
+    "user": "user",
+    "Assistant": "assistant",
+    "assistant": "assistant",
+}
+
+# Model id fragments of Bedrock models that accept cachePoint blocks in
+# converse. Llama models don't support prompt caching.
+_PROMPT_CACHE_MODELS: Final[tuple] = ('anthropic.claude', 'amazon.nova')
+_CACHE_POINT: Final[Dict[str, Any]] = {"cachePoint": {"type": "default"}}
+# Cached prefixes below the model minimum (1024+ tokens) are ignored by
+# Bedrock. Approximated in characters at ~4 per token.
+_MIN_CACHE_PREFIX_CHARS: Final[int] = 1024 * 4
+# Model id fragments of Bedrock models with a latency-optimized inference
+# profile. Other models reject performanceConfig latency "optimized".
+_LATENCY_OPTIMIZED_MODELS: Final[tuple] = (
+    'anthropic.claude-3-5-haiku', 'meta.llama3-1-70b', 'meta.llama3-1-405b', 'amazon.nova-pro'
+)
+
+# Upper bound on concurrent converse calls per process, tunable per deployment
+_BEDROCK_MAX_PARALLEL: Final[int] = int(os.environ.get('BEDROCK_MAX_PARALLEL', 32))
+
+# Bedrock client settings shared by every adapter
+_BEDROCK_CONFIG: Final[Config] = Config(
+    connect_timeout=10,  # 10 seconds connection timeout
+    read_timeout=60,     # 60 seconds read timeout
+    retries={
+        'max_attempts': 3,  # Retry up to 3 times
+        'mode': 'standard'  # Standard retry mode
+    },
+    # Sized for concurrent requests, botocore's default of 10
+    # makes threads queue for a connection under load.
+    max_pool_connections=_BEDROCK_MAX_PARALLEL,
+    # Keep idle pooled connections alive between chat turns, so a
+    # conversation's next call doesn't pay a fresh TCP/TLS handshake.
+    tcp_keepalive=True
+)
+# One bedrock-runtime client per process, created on first use. boto3 clients
+# are thread-safe once constructed, sessions are not.
+_bedrock_client = None
+_bedrock_client_lock = threading.Lock()
+
+def _get_bedrock_client():
+    """
+    Get the process-wide bedrock-runtime client, creating it on first use.
+
+    Raises:
+        NoCredentialsError: If no AWS credentials can be resolved
+    """
+    global _bedrock_client
+    if _bedrock_client is None:
+        with _bedrock_client_lock:
+            if _bedrock_client is None:
+                session = boto3.Session()
+                _bedrock_client = session.client('bedrock-runtime', config=_BEDROCK_CONFIG)
+    return _bedrock_client
+
+class _LazyJson:
+    """Defers JSON serialization of a debug payload until a handler formats it."""
+    __slots__ = ('obj',)
+
+    def __init__(self, obj: Any):
+        self.obj = obj
+
+    def __str__(self) -> str:
+        # Compact output, sliced as bytes so only the preview is decoded
+        return orjson.dumps(self.obj, default=str)[:_DEBUG_DUMP_LIMIT].decode(errors='ignore')
 
 class LLMAdapter:
     """Base class for LLM adapters"""
@@ -34,35 +174,85 @@ class LLMAdapter:
         """Generate a response from the LLM"""
         raise NotImplementedError
 
+    def generate_responses(self, batch: List[list], system_prompt: Any = None) -> List[dict]:
+        """Generate one response per conversation in batch, in order"""
+        return [self.generate_response(messages, system_prompt) for messages in batch]
+
+    async def agenerate_response(self, messages: list, system_prompt: Any = None) -> dict:
+        """Generate a response without blocking the event loop"""
+        return await asyncio.to_thread(self.generate_response, messages, system_prompt)
+
+def _add_cache_points(system_prompt: Any, conversation_text: list) -> Any:
+    """
+    Mark the stable prompt prefix for Bedrock prompt caching.
+
+    A cachePoint goes after the system blocks and at the end of the latest
+    user turn, so the next turn can reuse the cached system prompt and history.
+    Short prompts are left alone since Bedrock would not cache them anyway.
+
+    Args:
+        system_prompt: System blocks as built by build_system_prompt
+        conversation_text: Converse messages, the last user turn is extended in place
+
+    Returns:
+        The system blocks with a trailing cachePoint when one was added
+    """
+    if not isinstance(system_prompt, list):
+        return system_prompt
+    prefix_chars = sum(len(block.get("text", "")) for block in system_prompt)
+    if prefix_chars < _MIN_CACHE_PREFIX_CHARS:
+        return system_prompt
+    if not any("cachePoint" in block for block in system_prompt):
+        system_prompt = [*system_prompt, _CACHE_POINT]
+    if conversation_text and conversation_text[-1]["role"] == "user":
+        conversation_text[-1]["content"].append(_CACHE_POINT)
+    return system_prompt
+
+def _client_error_response(error: ClientError) -> Dict[str, str]:
+    """Log a Bedrock ClientError and map it to the error reply shown to the user"""
+    error_code = error.response.get('Error', {}).get('Code', 'Unknown')
+    error_message = error.response.get('Error', {}).get('Message', 'No error message')
+    logger.error("AWS Bedrock API error - Code: %s, Message: %s", error_code, error_message)
+
+    response = _CLIENT_ERROR_RESPONSES.get(error_code)
+    if response is None:
+        response = {BOT_TEXT_RESPONSE_KEY: _ERR_MODEL_TEMPLATE.format(error_message)}
+    return response
+
 class BedrockLlamaAdapter(LLMAdapter):
     """AWS Bedrock Llama adapter for conversational trip planning"""
     
-    def __init__(self):
-        # Store configuration but don't create client yet
-        self.config = {
-            'config': {
-                'connect_timeout': 10,  # 10 seconds connection timeout
-                'read_timeout': 60,     # 60 seconds read timeout
-                'retries': {
-                    'max_attempts': 3,  # Retry up to 3 times
-                    'mode': 'standard'  # Standard retry mode
-                },
-                'max_pool_connections': 10  # Limit connection pool size
-            }
-        }
-        logger.info("Bedrock client configuration initialized")
+    def __init__(self, enable_cache: bool = False, cache_size: int = 256, cache_ttl: float = 300):
+        """
+        Args:
+            enable_cache: Reuse the reply for byte-identical requests instead of
+                          calling Bedrock again. Leave off when varied
+                          (sampled) replies to the same prompt are expected.
+            cache_size: Number of distinct requests kept when caching is enabled
+            cache_ttl: Seconds a cached reply stays valid
+        """
+        # Async callers share one executor and are limited to as many
+        # in-flight converse calls as the HTTP pool has connections.
+        self._executor = ThreadPoolExecutor(
+            max_workers=_BEDROCK_MAX_PARALLEL,
+            thread_name_prefix='bedrock'
+        )
+        self._converse_slots = asyncio.Semaphore(_BEDROCK_MAX_PARALLEL)
+        # Keyed on a digest of the serialized request, only successful replies are cached
+        self._response_cache = TTLCache(cache_size, cache_ttl) if enable_cache else None
+        # Request settings derived from the model, resolved once per adapter
+        self._model_id = os.environ.get('AWS_MODEL_ID', 'meta.llama3-70b-instruct-v1:0')
+        self._use_cache_points = any(fragment in self._model_id for fragment in _PROMPT_CACHE_MODELS)
+        self._performance_config = (
+            {'latency': os.environ.get('AWS_BEDROCK_LATENCY', 'optimized')}
+            if any(fragment in self._model_id for fragment in _LATENCY_OPTIMIZED_MODELS) else None
+        )
+        logger.info("Bedrock client configuration initialized for model: %s", self._model_id)
         
     def _get_client(self):
-        """Create a new thread-local client instance"""
-        logging.getLogger('botocore').setLevel(logging.ERROR)
-        logging.getLogger('boto3').setLevel(logging.ERROR)
-        logging.getLogger('urllib3').setLevel(logging.ERROR)
-
+        """Get the shared Bedrock client, None if it cannot be created"""
         try:
-            # Create a new session and client for this request
-            session = boto3.Session()
-            client = session.client('bedrock-runtime')
-            return client
+            return _get_bedrock_client()
         except NoCredentialsError:
             logger.error("AWS credentials not found")
             return None
@@ -70,99 +260,249 @@ class BedrockLlamaAdapter(LLMAdapter):
             logger.error(f"Error creating Bedrock client: {str(e)}")
             return None
     
+    def _build_request(self, messages: list, system_prompt: Any) -> dict:
+        """Build the converse request for messages, shared by converse and converse_stream"""
+        # Convert messages to Llama format
+        conversation_text = [
+            {"role": _ROLE_MAP[message["role"]], "content": [{"text": message['content']}]}
+            for message in messages
+            if message["role"] in _ROLE_MAP
+        ]
+        if self._use_cache_points:
+            system_prompt = _add_cache_points(system_prompt, conversation_text)
+        request_config = {
+            'modelId': self._model_id,
+            'messages': conversation_text,
+            'system': system_prompt
+        }
+        if self._performance_config is not None:
+            request_config['performanceConfig'] = self._performance_config
+        return request_config
+
     def generate_response(self, messages: list, system_prompt: Any = None) -> dict:
         """Generate response using AWS Bedrock Llama models"""    
         try:
             # Log the incoming request
-            logger.debug(f"Generating response with system prompt: {system_prompt}")
-            logger.debug(f"Messages: {json.dumps(messages, indent=2)}")
+            logger.debug("Generating response with system prompt: %s", system_prompt)
+            logger.debug("Messages: %s", _LazyJson(messages))
             
-            # Convert messages to Llama format
-            conversation_text = []
-            # if system_prompt:
-            #     conversation_text += f"System: {system_prompt}\n\n"
-            
-            for message in messages:
-                if message["role"] == "user" :
-                    conversation_text.append({"role": "user", "content": [{"text":message['content']}]})
-                elif message["role"] == "Assistant":
-                    conversation_text.append({"role": "Assistant","content": [{"text":message['content']}]})
-                
-            # Get model ID from environment variable or use default
-            model_id = os.environ.get('AWS_MODEL_ID', 'meta.llama3-70b-instruct-v1:0')
-            logger.debug(f"Using model ID: {model_id}")    
+            request_config = self._build_request(messages, system_prompt)
             try:
-                # Add timeout to the request
-                request_config = {
-                    'modelId': model_id,
-                    'messages': conversation_text,
-                    'system': system_prompt
-                }
-                
-                # Get a fresh client for this request
+                # Reuse the cached client and its connection pool
                 client = self._get_client()
                 if not client:
-                     return {BOT_TEXT_RESPONSE_KEY: "I'm having trouble connecting to the AI service. Please try again later."}
+                     return _UNAVAILABLE_RESPONSE
                 
                 # Log the request with timing
                 start_time = time.time()
                 try:
-                    response =  client.converse(**request_config)
+                    if self._response_cache is not None:
+                        cache_key = hashlib.blake2b(orjson.dumps(request_config), digest_size=16).digest()
+                        response = self._response_cache.get(cache_key)
+                        if response is None:
+                            response = client.converse(**request_config)
+                            self._response_cache.put(cache_key, response)
+                    else:
+                        response = client.converse(**request_config)
                     elapsed = time.time() - start_time
-                    logger.debug(f"Received response: {json.dumps(response, indent=2)[:50000]}...")
-                    logger.debug(f"Bedrock API call completed in {elapsed:.2f} seconds")
+                    logger.debug("Received response: %s...", _LazyJson(response))
+                    logger.debug("Bedrock API call completed in %.2f seconds", elapsed)
                     if elapsed > 10:  # Log warning for slow responses
-                        logger.warning(f"Slow Bedrock API response: {elapsed:.2f} seconds")
+                        logger.warning("Slow Bedrock API response: %.2f seconds", elapsed)
                 except Exception as e:
                     elapsed = time.time() - start_time
-                    logger.error(f"Bedrock API call failed after {elapsed:.2f} seconds: {str(e)}")
+                    logger.error("Bedrock API call failed after %.2f seconds: %s", elapsed, e)
                     raise               
                 return response
         
             except ClientError as e:
-                error_code = e.response.get('Error', {}).get('Code', 'Unknown')
-                error_message = e.response.get('Error', {}).get('Message', 'No error message')
-                logger.error(f"AWS Bedrock API error - Code: {error_code}, Message: {error_message}")
-
-                if error_code == 'AccessDeniedException':
-                    return {BOT_TEXT_RESPONSE_KEY: "I don't have permission to access the language model. Please check your AWS permissions."}
-                elif error_code == 'ResourceNotFoundException':
-                    return {BOT_TEXT_RESPONSE_KEY: "The requested language model was not found. Please check the model ID."}
-                elif error_code == 'ThrottlingException':
-                    return {BOT_TEXT_RESPONSE_KEY: "The service is currently experiencing high traffic. Please try again in a moment."}
-                else:
-                    return {BOT_TEXT_RESPONSE_KEY: f"I encountered an error with the language model: {error_message}"}
+                return _client_error_response(e)
     
         except Exception as e:
                 error_type = type(e).__name__
                 error_message = str(e)
                 logger.critical(
-                    f"Unexpected error in generate_response: {error_type}: {error_message}\n"
-                    f"Full traceback:\n{traceback.format_exc()}"
+                    "Unexpected error in generate_response: %s: %s",
+                    error_type, error_message, exc_info=True
                 )
-                return {BOT_TEXT_RESPONSE_KEY: "I apologize, but I'm experiencing some technical difficulties. Please try again in a moment."}
+                return _TECHNICAL_RESPONSE
+
+    def generate_response_stream(self, messages: list, system_prompt: Any = None) -> Iterator[str]:
+        """
+        Generate a response with converse_stream, yielding text as it arrives.
+
+        The first chunk reaches the caller as soon as the model starts writing
+        instead of after the whole reply. Failures are yielded as the same
+        user-facing messages generate_response returns. Joined chunks can be
+        wrapped as {'output': {'message': {'content': [{'text': text}]}}} for
+        BedrockLlamaResponseParser.parse_response.
+
+        Args:
+            messages: Conversation messages with 'role' and 'content' keys
+            system_prompt: System prompt blocks as built by build_system_prompt
+
+        Yields:
+            str: Text deltas of the model reply
+        """
+        request_config = self._build_request(messages, system_prompt)
+        client = self._get_client()
+        if not client:
+            yield _ERR_UNAVAILABLE
+            return
+        start_time = time.time()
+        first_chunk_after = None
+        try:
+            response = client.converse_stream(**request_config)
+            for event in response['stream']:
+                delta = event.get('contentBlockDelta')
+                if delta is not None:
+                    text = delta['delta'].get('text')
+                    if text:
+                        if first_chunk_after is None:
+                            first_chunk_after = time.time() - start_time
+                        yield text
+                elif 'metadata' in event:
+                    logger.debug("Stream metadata: %s", _LazyJson(event['metadata']))
+        except ClientError as e:
+            yield _client_error_response(e)[BOT_TEXT_RESPONSE_KEY]
+            return
+        except Exception as e:
+            logger.critical(
+                "Unexpected error in generate_response_stream: %s: %s",
+                type(e).__name__, e, exc_info=True
+            )
+            yield _ERR_TECHNICAL
+            return
+        logger.debug(
+            "Bedrock stream completed in %.2f seconds, first chunk after %s seconds",
+            time.time() - start_time, first_chunk_after
+        )
+
+    async def agenerate_response(self, messages: list, system_prompt: Any = None) -> dict:
+        """
+        Generate a response from an async caller without blocking the event loop.
+
+        The blocking converse call runs on the adapter's executor. A semaphore
+        sized to the connection pool applies backpressure, so excess requests
+        wait here instead of queueing for an HTTP connection.
+        """
+        async with self._converse_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.generate_response, messages, system_prompt)
+
+    def generate_responses(self, batch: List[list], system_prompt: Any = None) -> List[dict]:
+        """
+        Generate responses for several independent conversations concurrently.
+
+        Each conversation is sent as its own converse call on the shared client,
+        run on the adapter's executor so concurrency stays within the pool size.
+
+        Args:
+            batch: List of message lists, one per conversation
+            system_prompt: System prompt shared by every conversation
+
+        Returns:
+            list: Responses in the same order as batch
+        """
+        if not batch:
+            return []
+        return list(self._executor.map(lambda messages: self.generate_response(messages, system_prompt), batch))
+
+    def generate_response_marshaled(self, items: List[str], template: str, system_prompt: Any = None) -> list:
+        """
+        Answer several small independent items with one model call per chunk.
+
+        The items are numbered into a single prompt and the model is asked for
+        a JSON array with one entry per item. Chunks are capped at
+        _MAX_MARSHALED_BATCH items.
+
+        Args:
+            items: Item texts to process
+            template: Description of the expected per-item answer
+            system_prompt: Optional system prompt in Bedrock format
+
+        Returns:
+            list: One entry per item, None where the model answer could not be parsed
+        """
+        results = []
+        for start in range(0, len(items), _MAX_MARSHALED_BATCH):
+            chunk = items[start:start + _MAX_MARSHALED_BATCH]
+            numbered = "\n".join(f"{i}. {item}" for i, item in enumerate(chunk, 1))
+            prompt = f"Items:\n{numbered}\nReturn a JSON array of {template}"
+            response = self.generate_response([{"role": "user", "content": prompt}], system_prompt)
+            results.extend(self._split_marshaled_response(response, len(chunk)))
+        return results
+
+    def _split_marshaled_response(self, response: dict, count: int) -> list:
+        """Split a marshaled JSON array answer back into count per-item results"""
+        text = ''
+        for content_block in response.get('output', {}).get('message', {}).get('content', []):
+            text += content_block.get('text', '')
+        start = text.find('[')
+        if start != -1:
+            try:
+                parsed, _ = _JSON_DECODER.raw_decode(text, start)
+            except json.JSONDecodeError as e:
+                logger.warning("Failed to parse marshaled response: %s", e)
+            else:
+                if isinstance(parsed, list) and len(parsed) == count:
+                    return parsed
+                logger.warning("Marshaled response had %d entries, expected %d", len(parsed) if isinstance(parsed, list) else 0, count)
+        return [None] * count
 
-        
     def build_system_prompt(self, system_prompt, guideLines=None, bot_response_format=None, cachePoint=None):
         #return [{"role": 'text', "content": [{"text":system_prompt}]}]
-        result = []
         if not system_prompt:  # Checks for None, empty string, or falsy value
             raise ValueError("system_prompt is required and cannot be empty")
-        result.append({"text": system_prompt})
-        if guideLines:
-            result.append({"text": guideLines})
-        if bot_response_format:
-            result.append({"text": bot_response_format})
+        result = list(_system_prompt_blocks(system_prompt, guideLines, bot_response_format))
         if cachePoint:
             result.append({"cachePoint": cachePoint})
         return result
 
+@functools.lru_cache(maxsize=128)
+def _system_prompt_blocks(system_prompt: str, guideLines: Optional[str], bot_response_format: Optional[str]) -> tuple:
+    """Build the Bedrock system text blocks, cached per distinct prompt text"""
+    result = [{"text": system_prompt}]
+    if guideLines:
+        result.append({"text": guideLines})
+    if bot_response_format:
+        result.append({"text": bot_response_format})
+    return tuple(result)
+
 from langchain_core.callbacks.manager import CallbackManagerForLLMRun
 from langchain_core.outputs import GenerationChunk
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.load import dumps
 from langchain_core.runnables import RunnableSequence
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, ToolMessage
+from langchain_core.callbacks.base import BaseCallbackHandler
+from langchain_core.output_parsers import StrOutputParser
+
+# Stateless default parser shared by every chain
+_STR_PARSER: Final[StrOutputParser] = StrOutputParser()
+
+# Chat role -> LangChain message builder, roles not listed are skipped
+_LANGCHAIN_MESSAGE_BUILDERS: Final[Dict[str, Any]] = {
+    'user': lambda msg: HumanMessage(content=msg.get('content', '')),
+    'assistant': lambda msg: AIMessage(content=msg.get('content', '')),
+    'tool': lambda msg: ToolMessage(content=msg.get('content', ''), tool_call_id=msg.get('tool_call_id', '')),
+}
+
+class RawResponseCallback(BaseCallbackHandler):
+    """Captures the raw LLM result and usage metadata of a single chain run."""
+
+    def __init__(self):
+        super().__init__()
+        self.raw_response = None
+        self.metadata = {}
+
+    def on_llm_end(self, response, **kwargs):
+        self.raw_response = response
+        logger.debug("Raw response: %s", _LazyJson(response))
+        self.metadata.update({
+            'model_name': getattr(response, 'model_name', None),
+            'token_usage': getattr(response, 'usage', {})
+        })
 
 class BedrockLangChainLlamaAdapter(LLMAdapter):
     """LangChain style adapter for AWS Bedrock's Llama models with | operator support."""
@@ -171,32 +511,37 @@ class BedrockLangChainLlamaAdapter(LLMAdapter):
         self.model_id = model_id
         self.temperature = temperature
         self.client = None
-        logger.info(f"Initialized BedrockLangChainLlamaAdapter with model: {model_id}")
+        self._llm = None
+        logger.info("Initialized BedrockLangChainLlamaAdapter with model: %s", model_id)
     
     def _get_client(self):
         """Get or create a Bedrock client."""
-        logging.getLogger('botocore').setLevel(logging.DEBUG)
-        logging.getLogger('boto3').setLevel(logging.ERROR)
-        logging.getLogger('urllib3').setLevel(logging.ERROR)
         if self.client is None:
             try:
-                session = boto3.Session()
-                self.client = session.client('bedrock-runtime')
+                self.client = _get_bedrock_client()
             except Exception as e:
                 logger.error(f"Error creating Bedrock client: {str(e)}")
                 raise
         return self.client
     
     def build_system_prompt(self, system_prompt: str, guidelines: Optional[str] = None, 
-                          response_format: Optional[dict] = None) -> Any:
-        """Build a system prompt with optional guidelines and response format."""
+                          response_format: Optional[Union[dict, str]] = None) -> Any:
+        """
+        Build a system prompt with optional guidelines and response format.
+
+        response_format may be passed already serialized as a JSON string so
+        callers reusing the same schema only serialize it once.
+        """
         prompt_parts = [system_prompt]
         
         if guidelines:
             prompt_parts.append(f"\nGuidelines:\n{guidelines}")
             
         if response_format:
-            format_str = json.dumps(response_format, indent=2)
+            if isinstance(response_format, str):
+                format_str = response_format
+            else:
+                format_str = orjson.dumps(response_format, option=orjson.OPT_INDENT_2).decode()
             prompt_parts.append(f"Respond ONLY in JSON.Fill UserData if avaialble in JSON.\n{format_str}")
             
         return "\n".join(prompt_parts)
@@ -230,61 +575,27 @@ class BedrockLangChainLlamaAdapter(LLMAdapter):
                             langchain_messages.append(SystemMessage(content=item['text']))
             
             # Add conversation messages
-            for msg in messages:
-                role = msg.get('role', '').lower()
-                content = msg.get('content', '')
-                
-                if role == 'user':
-                    langchain_messages.append(HumanMessage(content=content))
-                elif role == 'assistant':
-                    langchain_messages.append(AIMessage(content=content))
-                elif role == 'tool':
-                    langchain_messages.append(ToolMessage(
-                        content=content, 
-                        tool_call_id=msg.get('tool_call_id', '')
-                    ))
-            
-            # Create prompt and chain
-            prompt = ChatPromptTemplate.from_messages(langchain_messages)
-            logger.debug(f"Going ahead with prompt:\n{dumps(prompt, pretty=True)}")
-            
-            # Create the LLM with callback for raw response
-            from langchain_core.callbacks.base import BaseCallbackHandler
-            
-            class RawResponseCallback(BaseCallbackHandler):
-                def __init__(self):
-                    super().__init__()
-                    self.raw_response = None
-                    self.metadata = {}
-                
-                def on_llm_end(self, response, **kwargs):
-                    self.raw_response = response
-                    logger.debug(f"Raw response: {json.dumps(response, indent=2)[:50000]}")
-                    self.metadata.update({
-                        'model_name': getattr(response, 'model_name', None),
-                        'token_usage': getattr(response, 'usage', {})
-                    })
-            
-            # Initialize callback
-            callback = RawResponseCallback()
+            langchain_messages.extend(
+                _LANGCHAIN_MESSAGE_BUILDERS[role](msg)
+                for msg in messages
+                if (role := msg.get('role', '').lower()) in _LANGCHAIN_MESSAGE_BUILDERS
+            )
             
-            # Configure the LLM with our callback
-            llm = self._create_langchain_llm().with_config({
-                'callbacks': [callback]
-            })
+            # Create the chain
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Going ahead with prompt:\n%s", dumps(langchain_messages, pretty=True))
             
-            # Create and invoke the chain
-            chain = prompt | llm
-            if output_parser:
-                chain = chain | output_parser
-            else:
-                from langchain_core.output_parsers import StrOutputParser
-                chain = chain | StrOutputParser()
+            # Only track the raw response when the caller asked for it
+            callback = RawResponseCallback() if return_raw else None
+
+            # The messages have no template variables, so they are passed to the
+            # shared LLM directly instead of through a ChatPromptTemplate.
+            chain = self._get_llm() | (output_parser or _STR_PARSER)
             
             start_time = time.time()
-            response = chain.invoke({})
+            response = chain.invoke(langchain_messages, config={'callbacks': [callback]} if callback else None)
             elapsed = time.time() - start_time
-            logger.debug(f"LLM processing completed in {elapsed:.2f} seconds")
+            logger.debug("LLM processing completed in %.2f seconds", elapsed)
             
             # Return raw response if requested
             if return_raw:
@@ -320,14 +631,20 @@ class BedrockLangChainLlamaAdapter(LLMAdapter):
                 BOT_TEXT_RESPONSE_KEY: f"I encountered an error: {str(e)}",
                 USER_DATA_KEY: {},
                 QUESTION_KEY: None,
-                'error': str(e),
-                'traceback': traceback.format_exc()
+                'error': str(e)
             }
     
+    def _get_llm(self):
+        """Get or create the LangChain LLM instance shared across calls."""
+        if self._llm is None:
+            self._llm = self._create_langchain_llm()
+        return self._llm
+
     def _create_langchain_llm(self):
         """Create a LangChain compatible LLM instance."""
+        # langchain_aws pulls in a large import graph and is only needed when
+        # the LangChain adapter is selected, so it is imported on first use.
         from langchain_aws import BedrockLLM
-        
         return BedrockLLM(
             model_id=self.model_id,
             client=self._get_client(),
@@ -342,9 +659,10 @@ class BedrockLangChainLlamaAdapter(LLMAdapter):
     def __or__(self, other):
         """Enable the | operator for chaining with other LangChain components."""
         if isinstance(other, (ChatPromptTemplate, PromptTemplate)):
-            return RunnableSequence(other, self._create_langchain_llm())
+            return RunnableSequence(other, self._get_llm())
         return NotImplemented
 
+import anyio
 from langchain_core.output_parsers import BaseOutputParser
 from typing import TypeVar, Any, Dict
 
@@ -355,14 +673,17 @@ class BedrockLlamaResponseParser(BaseOutputParser[Dict[str, Any]]):
     def _type(self) -> str:
         return "bedrock_llama_response_parser"
 
-    async def aparse(self, text: str) -> Dict[str, Any]:
-        import anyio
-        return await anyio.to_thread(self.parse, text)
+    async def aparse(self, text: str) -> BotResponse:
+        # Parsing a typical reply is cheaper than a worker thread handoff,
+        # only offload payloads large enough to stall the event loop.
+        if len(text) < _INLINE_PARSE_LIMIT:
+            return self.parse(text)
+        return await anyio.to_thread.run_sync(self.parse, text)
     
-    def parse(self, text: str) -> Dict[str, Any]:
+    def parse(self, text: str) -> BotResponse:
         return self.parse_response(text)
 
-    def extract_bot_format_from_json(self, text):
+    def extract_bot_format_from_json(self, text) -> Optional[BotResponse]:
         """
         Extract and process bot response in the expected format.
         
@@ -373,34 +694,48 @@ class BedrockLlamaResponseParser(BaseOutputParser[Dict[str, Any]]):
             dict or None: Parsed result dictionary if successful, None otherwise
         """
         try:
-            parsed = json.loads(text)
-            self.logger.debug(f'Parsed response: {json.dumps(parsed, indent=2)[:50000]}')
-            result = {}         
-            # Handle message from parsed JSON
-            if BOT_TEXT_RESPONSE_KEY in parsed:
-                result[BOT_TEXT_RESPONSE_KEY] = parsed.get(BOT_TEXT_RESPONSE_KEY, '')      
-            # Handle UserData
-            if USER_DATA_KEY in parsed:
-                result[USER_DATA_KEY] = parsed.get(USER_DATA_KEY, {})               
-            # Handle question extraction
-            if QUESTION_KEY in parsed:
-                result[QUESTION_KEY] = parsed.get(QUESTION_KEY, '')
-                # Check for questions if question is not in the format
-                if not result[QUESTION_KEY] and BOT_TEXT_RESPONSE_KEY in result and any(
-                    marker in result[BOT_TEXT_RESPONSE_KEY].lower() 
-                    for marker in ['?', 'could you', 'would you', 'can you', 'please tell', 'what is', 'when is', 'where is']
-                ):
-                    result[QUESTION_KEY] = result[BOT_TEXT_RESPONSE_KEY]
-                    result[BOT_TEXT_RESPONSE_KEY] = None
-            
-            self.logger.debug(f'extracted result from json: {json.dumps(result, indent=2)[:50000]}')
-            return result if any(result.values()) else None
-            
+            parsed = orjson.loads(text)
         except json.JSONDecodeError as e:
-            self.logger.debug(f"JSON decode error in extractBotFormat: {str(e)}")
+            logger.debug("JSON decode error in extractBotFormat: %s", e)
+            parsed = _loads_lenient(text) if _LENIENT_JSON else None
+            if parsed is None:
+                return None
+        if not isinstance(parsed, dict):
             return None
+        return self._bot_format_from_parsed(parsed)
+
+    def _bot_format_from_parsed(self, parsed: dict) -> Optional[BotResponse]:
+        """
+        Pick the bot format keys out of an already decoded JSON object.
+
+        Args:
+            parsed: Decoded JSON object from the model reply
+
+        Returns:
+            dict or None: Bot format dictionary, None if it carries no values
+        """
+        logger.debug("Parsed response: %s", _LazyJson(parsed))
+        result: BotResponse = {}
+        # Handle message from parsed JSON
+        if BOT_TEXT_RESPONSE_KEY in parsed:
+            result[BOT_TEXT_RESPONSE_KEY] = parsed.get(BOT_TEXT_RESPONSE_KEY, '')      
+        # Handle UserData
+        if USER_DATA_KEY in parsed:
+            result[USER_DATA_KEY] = parsed.get(USER_DATA_KEY, {})               
+        # Handle question extraction
+        if QUESTION_KEY in parsed:
+            result[QUESTION_KEY] = parsed.get(QUESTION_KEY, '')
+            # Check for questions if question is not in the format
+            if not result[QUESTION_KEY] and result.get(BOT_TEXT_RESPONSE_KEY) and _is_question(
+                result[BOT_TEXT_RESPONSE_KEY]
+            ):
+                result[QUESTION_KEY] = result[BOT_TEXT_RESPONSE_KEY]
+                result[BOT_TEXT_RESPONSE_KEY] = None
+        
+        logger.debug("extracted result from json: %s", _LazyJson(result))
+        return result if any(result.values()) else None
     
-    def extract_bot_fromat_from_Text(self, text: str) -> dict:
+    def extract_bot_fromat_from_Text(self, text: str) -> BotResponse:
         """
         Extract and process structured data from the LLM response.
         
@@ -413,43 +748,25 @@ class BedrockLlamaResponseParser(BaseOutputParser[Dict[str, Any]]):
                   - UserData: Extracted user data as a dictionary
                   - question: Any follow-up question if present
         """
-        try:
-            # Find the first occurrence of '{' and last occurrence of '}'
-            start = text.find('{')
-            end = text.rfind('}')
-            
-            if start == -1 or end == -1 or start >= end:
-                # If no JSON object found, return the text as is
-                return {BOT_TEXT_RESPONSE_KEY: text}
-                
-            # Extract the JSON string
-            json_str = text[start:end+1]
-            logger.debug(f"Extracted String is {json_str}")
-            # Parse the JSON string
-            result = json.loads(json_str)
-            # capture line before { and append to result[BOT_TEXT_RESPONSE_KEY]
-            if(result[BOT_TEXT_RESPONSE_KEY]):
-                if(text[0:start-1]):
-                    result[BOT_TEXT_RESPONSE_KEY] = text[0:start-1] + result[BOT_TEXT_RESPONSE_KEY]
- 
-            # Ensure the result is a dictionary
-            if not isinstance(result, dict):
-                return {BOT_TEXT_RESPONSE_KEY: text}
-                
-            # Ensure the required keys exist in the result
-            if BOT_TEXT_RESPONSE_KEY not in result:
-                result[BOT_TEXT_RESPONSE_KEY] = text
-            
-            return result
-            
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse JSON from response: {e}")
-            return {BOT_TEXT_RESPONSE_KEY: text}
-        except Exception as e:
-            logger.error(f"Unexpected error parsing response: {e}")
+        parsed, prefix = _try_parse_json_prefix(text)
+        if parsed is None:
+            # If no JSON object found, return the text as is
             return {BOT_TEXT_RESPONSE_KEY: text}
+        return self._merge_text_prefix(parsed, prefix, text)
+
+    def _merge_text_prefix(self, result: dict, prefix: str, text: str) -> BotResponse:
+        """Fold the text preceding an embedded JSON object into its response"""
+        # capture line before { and append to result[BOT_TEXT_RESPONSE_KEY]
+        if prefix and result.get(BOT_TEXT_RESPONSE_KEY):
+            result[BOT_TEXT_RESPONSE_KEY] = prefix + result[BOT_TEXT_RESPONSE_KEY]
+
+        # Ensure the required keys exist in the result
+        if BOT_TEXT_RESPONSE_KEY not in result:
+            result[BOT_TEXT_RESPONSE_KEY] = text
+        
+        return result
     
-    def parse_response(self, response) -> dict:
+    def parse_response(self, response) -> BotResponse:
         """
         Parse the LLM response and return a dictionary with the text response.
         
@@ -459,49 +776,120 @@ class BedrockLlamaResponseParser(BaseOutputParser[Dict[str, Any]]):
         Returns:
             dict: Contains 'message' and 'data' keys from the response
         """
-        logger.debug(f'Model Latency in ms: {response["metrics"]["latencyMs"]}')
-        logger.debug(f'Response stop reason {response["stopReason"]}')
-        logger.debug(f'Usage metrics total tokens: {response["usage"]["totalTokens"]}')
-        logger.debug(f'Usage metrics input tokens: {response["usage"].get("inputTokens")}')
-        logger.debug(f'Usage metrics output tokens: {response["usage"].get("outputTokens")}')
+        if logger.isEnabledFor(logging.DEBUG) and isinstance(response, dict):
+            metrics = response.get("metrics", {})
+            usage = response.get("usage", {})
+            logger.debug(
+                "Model latency: %sms, stop reason: %s, tokens total: %s, input: %s, output: %s, "
+                "cache read: %s, cache write: %s",
+                metrics.get("latencyMs"), response.get("stopReason"),
+                usage.get("totalTokens"), usage.get("inputTokens"), usage.get("outputTokens"),
+                usage.get("cacheReadInputTokens"), usage.get("cacheWriteInputTokens")
+            )
         
-        result = {}
+        result: BotResponse = {}
+        # Bind the keys and matcher locally, this loop runs for every content block
+        bot_text_key = BOT_TEXT_RESPONSE_KEY
+        question_key = QUESTION_KEY
+        tool_call_key = TOOL_CALL_KEY
+        is_question = _is_question
         
         if isinstance(response, dict):
+            if 'output' not in response and response.get(bot_text_key):
+                # Error reply from the adapter, surface its message as is
+                result[bot_text_key] = response[bot_text_key]
+                return result
             output_message = response.get('output', {}).get('message', {})
             for content_block in output_message.get('content', []):
                 if 'text' in content_block and content_block['text']:
-                    try:
-                        # Try to parse as JSON
-                        text = content_block['text'].strip()
-                        if text.startswith('{') and text.endswith('}'):
-                            parsed_result = self.extract_bot_format_from_json(text)
-                            if parsed_result:
-                                result.update(parsed_result)
-                                continue  # Successfully parsed, no need to process further
-                        # If not in bot format, try to extract as plain text
-                        text_parsed_results = self.extract_bot_fromat_from_Text(content_block['text'])
-                        if text_parsed_results:
-                            result.update(text_parsed_results)
-                            continue
-                        # Text did not have the prescribed format    
-                        # Check if the text contains a question
-                        # TODO: Move this phrases into templates and eventually language specific templates.
-                        if any(marker in text.lower() for marker in ['?', 'could you', 'would you', 'can you', 'please tell', 'what is', 'when is', 'where is']):
-                            result[QUESTION_KEY] = text
-                        else:
-                            result[BOT_TEXT_RESPONSE_KEY] = text
-                    except json.JSONDecodeError as e:
-                        self.logger.debug(f"Json Decode error {str(e)}")
-                        result[BOT_TEXT_RESPONSE_KEY] = text
-
-                if TOOL_CALL_KEY in content_block and content_block[TOOL_CALL_KEY]:
-                    result[TOOL_CALL_KEY] = content_block[TOOL_CALL_KEY]
+                    # Decode any JSON object in the text exactly once
+                    text = content_block['text'].strip()
+                    parsed, prefix = _try_parse_json_prefix(text)
+                    if parsed is not None:
+                        # Whole reply is the bot format, take its keys as is
+                        parsed_result = None if prefix else self._bot_format_from_parsed(parsed)
+                        result.update(parsed_result or self._merge_text_prefix(parsed, prefix, text))
+                    # Text did not have the prescribed format    
+                    # Check if the text contains a question
+                    elif is_question(text):
+                        result[question_key] = text
+                    else:
+                        result[bot_text_key] = text
+
+                if tool_call_key in content_block and content_block[tool_call_key]:
+                    result[tool_call_key] = content_block[tool_call_key]
                 if 'parameters' in content_block and content_block['parameters']:
                     result["parameters"] = content_block['parameters']
         
         return result
 
+def _try_parse_json_prefix(text: str) -> Tuple[Optional[dict], str]:
+    """
+    Decode the first JSON object embedded in text.
+
+    Args:
+        text: Model reply that may contain a JSON object
+
+    Returns:
+        tuple: (decoded object, stripped text before it) or (None, text)
+               when no JSON object could be decoded
+    """
+    start = text.find('{')
+    if start == -1:
+        return None, text
+    if start == 0 and text.endswith('}'):
+        # Whole reply is a JSON object, the common case for prompted models
+        try:
+            parsed = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+        else:
+            if isinstance(parsed, dict):
+                return parsed, ''
+    first = start
+    # Prose before the object may contain stray braces, so a failed decode
+    # resumes at the next '{' past the error, for a bounded number of attempts.
+    # Braces before the error position belong to the broken candidate.
+    for _ in range(_JSON_PREFIX_ATTEMPTS):
+        try:
+            parsed, end = _JSON_DECODER.raw_decode(text, start)
+        except json.JSONDecodeError as e:
+            error = e
+            start = text.find('{', max(start + 1, e.pos))
+            if start == -1:
+                break
+        else:
+            logger.debug("Extracted String is %s", text[start:end])
+            return parsed, text[:start].rstrip()
+    if _LENIENT_JSON:
+        end = text.rfind('}')
+        parsed = _loads_lenient(text[first:end + 1]) if end > first else None
+        if parsed is not None:
+            return parsed, text[:first].rstrip()
+    logger.warning("Failed to parse JSON from response: %s", error)
+    return None, text
+
+def _loads_lenient(text: str) -> Optional[dict]:
+    """
+    Decode near-JSON with json5, only called once strict decoding failed.
+
+    Args:
+        text: Candidate JSON object text
+
+    Returns:
+        dict or None: Decoded object, None if json5 is missing or fails too
+    """
+    try:
+        import json5
+    except ImportError:
+        logger.warning("TRIPBOT_LENIENT_JSON is set but json5 is not installed")
+        return None
+    try:
+        parsed = json5.loads(text)
+    except ValueError as e:
+        logger.debug("json5 decode error: %s", e)
+        return None
+    return parsed if isinstance(parsed, dict) else None
 
 __all__ = ['LLMAdapter', 'BedrockLlamaAdapter', 'BedrockLangChainLlamaAdapter', 
-           'BedrockLlamaResponseParser', 'BOT_TEXT_RESPONSE_KEY', 'QUESTION_KEY', 'USER_DATA_KEY', 'TOOL_CALL_KEY',TOOL_PARAMETERS_KEY]
+           'BedrockLlamaResponseParser', 'BotResponse', 'BOT_TEXT_RESPONSE_KEY', 'QUESTION_KEY', 'USER_DATA_KEY', 'TOOL_CALL_KEY', 'TOOL_PARAMETERS_KEY']
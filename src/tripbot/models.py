@@ -1,13 +1,14 @@
 from tripbot.database import Base
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, JSON
-from datetime import datetime,timezone
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, JSON, func
 
 class TripBooking(Base):
     """Model for storing trip bookings"""
     __tablename__ = 'trip_bookings'
+    # Read the database generated timestamps back in the INSERT/UPDATE itself
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True)
     traveler_name = Column(String(100), nullable=False)
-    traveler_email = Column(String(120), nullable=False)
+    traveler_email = Column(String(120), nullable=False, index=True)
     destination = Column(String(200), nullable=False)
     departure_location = Column(String(200), nullable=False)
     departure_date = Column(Date, nullable=False)
@@ -19,48 +20,56 @@ class TripBooking(Base):
     booking_status = Column(String(50), default="confirmed")
     total_amount = Column(Float, nullable=True)
     payment_status = Column(String(50), default="pending")
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    # Timestamps are set by the database (CURRENT_TIMESTAMP, UTC on SQLite)
+    created_at = Column(DateTime, default=func.now(), server_default=func.now(), index=True)
+    updated_at = Column(DateTime, default=func.now(), server_default=func.now(), onupdate=func.now())
+
+    # Fields returned by to_dict, in output order, and the date ones among them
+    _DICT_FIELDS = (
+        'id', 'traveler_name', 'traveler_email', 'destination', 'departure_location',
+        'departure_date', 'return_date', 'travelers_count', 'trip_type', 'budget',
+        'preferences', 'booking_status', 'total_amount', 'payment_status', 'created_at'
+    )
+    _ISO_FIELDS = ('departure_date', 'return_date', 'created_at')
 
     def to_dict(self):
         """Convert booking to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'traveler_name': self.traveler_name,
-            'traveler_email': self.traveler_email,
-            'destination': self.destination,
-            'departure_location': self.departure_location,
-            'departure_date': self.departure_date.isoformat() if self.departure_date else None,
-            'return_date': self.return_date.isoformat() if self.return_date else None,
-            'travelers_count': self.travelers_count,
-            'trip_type': self.trip_type,
-            'budget': self.budget,
-            'preferences': self.preferences,
-            'booking_status': self.booking_status,
-            'total_amount': self.total_amount,
-            'payment_status': self.payment_status,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        # Loaded column values live in the instance __dict__; reading them
+        # there skips the attribute instrumentation. Unloaded ones map to None.
+        state = self.__dict__
+        data = {name: state.get(name) for name in self._DICT_FIELDS}
+        for name in self._ISO_FIELDS:
+            value = data[name]
+            data[name] = value.isoformat() if value else None
+        return data
 
 class ChatSession(Base):
     """Model for storing chat sessions and conversation state"""
     __tablename__ = 'chat_sessions'
+    __mapper_args__ = {"eager_defaults": True}
     id = Column(Integer, primary_key=True)
-    session_id = Column(String(100), unique=True, nullable=False)
+    session_id = Column(String(100), unique=True, index=True, nullable=False)
     conversation_state = Column(JSON, nullable=True)  # Store conversation state as JSON
     current_step = Column(String(50), default="greeting")
     collected_data = Column(JSON, nullable=True)  # Store collected trip data
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), server_default=func.now(), onupdate=func.now())
+
+    _DICT_FIELDS = ('id', 'session_id', 'conversation_state', 'current_step', 'collected_data', 'created_at')
 
     def to_dict(self):
         """Convert session to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'session_id': self.session_id,
-            'conversation_state': self.conversation_state,
-            'current_step': self.current_step,
-            'collected_data': self.collected_data,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        state = self.__dict__
+        data = {name: state.get(name) for name in self._DICT_FIELDS}
+        created_at = data['created_at']
+        data['created_at'] = created_at.isoformat() if created_at else None
+        return data
+
 
+class FlightOffer(Base):
+    """Flight offer from a recent search, held until the user books it or it expires"""
+    __tablename__ = 'flight_offers'
+    # Opaque token handed to the browser in place of the offer
+    token = Column(String(32), primary_key=True)
+    offer = Column(JSON, nullable=False)  # Full offer as returned by the flight search API
+    expires_at = Column(DateTime, nullable=False, index=True)  # Naive UTC
@@ -1,14 +1,18 @@
-import uuid
+import os
+import re
+import secrets
 from pathlib import Path
-import json
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from typing import Dict, Any, Optional
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, select
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.attributes import flag_modified
 
 # Import logging configuration
 from tripbot.config.logging_config import setup_logging
@@ -28,13 +32,41 @@ from booking_service import BookingService
 
 router = APIRouter()
 
+# Patterns used by extract_data_from_message, compiled once at import.
+_DIGIT_RE = re.compile(r'\d+')
+_BUDGET_RE = re.compile(r'[\$]?(\d+)')
+_ROUND_TRIP_RE = re.compile(r'\b(?:round|return|back)\b', re.IGNORECASE)
+_ONE_WAY_RE = re.compile(r'\b(?:one[\s-]?way|one|single)\b', re.IGNORECASE)
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+
 # Get the directory where this file is located
 current_dir = Path(__file__).parent
 templates = Jinja2Templates(directory=str(current_dir / ".." / ".." / "templates"))
+# Templates are compiled once by warm_templates() at startup; set
+# TRIPBOT_TEMPLATE_RELOAD while editing them to pick up changes per request.
+templates.env.auto_reload = os.environ.get('TRIPBOT_TEMPLATE_RELOAD', '').lower() in ('1', 'true', 'yes')
+TEMPLATE_NAMES = ("index.html", "flight_search_widget.html")
 # Initialize services
-trip_bot = TripPlannerBot(preferred_llm="bedrock")  # Can be changed to "gemini" or "bedrock"
+trip_bot = TripPlannerBot(preferred_llm="bedrock", enable_cache=True)  # Can be changed to "gemini" or "bedrock"
 booking_service = BookingService()
 
+# Messages kept in a session's stored history (the last 10 exchanges). Older
+# turns are dropped on write, collected_data carries what they established.
+MAX_HISTORY_MESSAGES = 20
+
+# Session lookup for a chat turn, built once. session_id carries a unique
+# index, and only the columns a turn reads are loaded.
+_SESSION_BY_ID = (
+    select(ChatSession)
+    .options(load_only(ChatSession.conversation_state, ChatSession.current_step, ChatSession.collected_data))
+    .where(ChatSession.session_id == bindparam('session_id'))
+)
+
+def warm_templates() -> None:
+    """Compile the page templates so the first request doesn't pay for it."""
+    for name in TEMPLATE_NAMES:
+        templates.get_template(name)
+
 class ChatRequest(BaseModel):
     message: str
 
@@ -72,13 +104,11 @@ async def chat(
     # Get or create session
     session_id = request.headers.get('x-session-id')  # Headers are case-insensitive
     if not session_id:
-        session_id = str(uuid.uuid4())
+        session_id = secrets.token_hex(16)
         logger.info(f"Generated new session ID: {session_id}")
         
     # Query the session by session_id (which is not the primary key)
-    result = await db.execute(
-        select(ChatSession).where(ChatSession.session_id == session_id)
-    )
+    result = await db.execute(_SESSION_BY_ID, {'session_id': session_id})
     chat_session = result.scalar_one_or_none()
     #TODO: Set up observer on collected_data
     if not chat_session:
@@ -101,20 +131,23 @@ async def chat(
                 'preferences': {}
             }
         )
+        # Inserted by the single commit at the end of the turn
         db.add(chat_session)
-        await db.commit()
-        await db.refresh(chat_session)
     
-    # Get conversation history
+    # Get conversation history. The JSON columns hold native values; rows
+    # written before that stored serialized strings, decode those once.
     conversation_history = chat_session.conversation_state.get('messages', [])
-    if(conversation_history):
-        conversation_history = json.loads(conversation_history)
+    if isinstance(conversation_history, str):
+        conversation_history = orjson.loads(conversation_history)
+    stored_data = chat_session.collected_data or {}
+    if isinstance(stored_data, str):
+        stored_data = orjson.loads(stored_data)
     # Generate bot response
-    bot_response, next_step, collected_data =  trip_bot.generate_response(
+    bot_response, next_step, collected_data = await trip_bot.agenerate_response(
         user_message,
         conversation_history,
         chat_session.current_step,
-        json.loads(chat_session.collected_data) if chat_session.collected_data and isinstance(chat_session.collected_data, str) else (chat_session.collected_data if chat_session.collected_data else {})
+        stored_data
     )
         
     # Extract and store relevant data from user message
@@ -128,13 +161,20 @@ async def chat(
     # Update conversation history
     conversation_history.append({'role': 'user', 'content': user_message})
     conversation_history.append({'role': 'assistant', 'content': bot_response})
+    # Trim in place to the stored window
+    overflow = len(conversation_history) - MAX_HISTORY_MESSAGES
+    if overflow > 0:
+        del conversation_history[:overflow]
         
     # Update chat session
-    chat_session.conversation_state = {'messages': json.dumps(conversation_history)}
+    chat_session.conversation_state = {'messages': conversation_history}
     chat_session.current_step = next_step
-    chat_session.collected_data = json.dumps(collected_data)
+    chat_session.collected_data = collected_data
+    # Both values were mutated in place, so the ORM cannot see the change
+    # by comparison; mark the columns dirty explicitly.
+    flag_modified(chat_session, 'conversation_state')
+    flag_modified(chat_session, 'collected_data')
     await db.commit()
-    await db.refresh(chat_session)
         
     # Handle booking and payment steps
     additional_data = {}
@@ -144,23 +184,11 @@ async def chat(
         additional_data['cost_breakdown'] = cost_breakdown
     elif next_step == 'final_confirmation':
         # Create booking and process payment
-            booking = await booking_service.create_booking(updated_data)
-            if booking:
-                payment_result = await booking_service.process_payment(booking.id, {})
-                additional_data['booking'] = booking.to_dict()
-                additional_data['payment'] = payment_result
-    additional_data = {}
-    if next_step == 'booking_confirmation':
-        # Calculate trip cost
-        cost_breakdown = await booking_service.calculate_trip_cost(updated_data)
-        additional_data['cost_breakdown'] = cost_breakdown
-    elif next_step == 'final_confirmation':
-        # Create booking and process payment
-            booking = await booking_service.create_booking(updated_data)
-            if booking:
-                payment_result = await booking_service.process_payment(booking.id, {})
-                additional_data['booking'] = booking.to_dict()
-                additional_data['payment'] = payment_result
+        booking = await booking_service.create_booking(updated_data)
+        if booking:
+            payment_result = await booking_service.process_payment(booking.id, {})
+            additional_data['booking'] = booking.to_dict()
+            additional_data['payment'] = payment_result
     
     # Check if we should trigger flight search
     tool_call = bot_response.get(TOOL_CALL_KEY, "")
@@ -182,92 +210,112 @@ async def chat(
     if QUESTION_KEY in bot_response:
         response_data[QUESTION_KEY] = bot_response[QUESTION_KEY]
         
-    #Create JSONResponse with the session ID in headers
-    response = JSONResponse(content=response_data)
+    #Create ORJSONResponse with the session ID in headers
+    response = ORJSONResponse(content=response_data)
     response.headers['x-session-id'] = session_id
     
     return response
         
 @router.post('/api/reset')
-def reset_session():
+async def reset_session(request: Request, db: AsyncSession = Depends(get_db)):
     """Reset chat session"""
     try:
-        session_id = session.get('session_id')
+        session_id = request.headers.get('x-session-id')
         if session_id:
-            chat_session = ChatSession.query.filter_by(session_id=session_id).first()
-            if chat_session:
-                db.session.delete(chat_session)
-                db.session.commit()
-        
-        session.clear()
-        return jsonify({'success': True})
+            await db.execute(delete(ChatSession).where(ChatSession.session_id == session_id))
+            await db.commit()
+        return {'success': True}
         
     except Exception as e:
         logger.error(f"Error resetting session: {e}")
-        return jsonify({'error': 'Failed to reset session'}), 500
+        await db.rollback()
+        return ORJSONResponse(status_code=500, content={'error': 'Failed to reset session'})
+
+# Step handlers for extract_data_from_message. Each takes the raw and the
+# stripped message plus the existing data, and copies the data only when it
+# has something to write; otherwise the existing dict is returned as is.
+
+def _extract_name(message: str, text: str, existing_data: dict) -> dict:
+    # Simple approach - take the message as name
+    if existing_data.get('traveler_name'):
+        return existing_data
+    return {**existing_data, 'traveler_name': text}
+
+def _extract_email(message: str, text: str, existing_data: dict) -> dict:
+    match = _EMAIL_RE.search(message)
+    if not match:
+        return existing_data
+    return {**existing_data, 'traveler_email': match.group(0)}
+
+def _extract_destination(message: str, text: str, existing_data: dict) -> dict:
+    if existing_data.get('destination'):
+        return existing_data
+    return {**existing_data, 'destination': text}
+
+def _extract_departure_location(message: str, text: str, existing_data: dict) -> dict:
+    if existing_data.get('departure_location'):
+        return existing_data
+    return {**existing_data, 'departure_location': text}
+
+def _extract_dates(message: str, text: str, existing_data: dict) -> dict:
+    # TODO: Add sophisticated date parsing.
+    if not existing_data.get('departure_date'):
+        return {**existing_data, 'departure_date': text}
+    if not existing_data.get('return_date'):
+        return {**existing_data, 'return_date': text}
+    return existing_data
+
+def _extract_travelers_count(message: str, text: str, existing_data: dict) -> dict:
+    match = _DIGIT_RE.search(message)
+    if not match:
+        return existing_data
+    return {**existing_data, 'travelers_count': match.group(0)}
+
+def _extract_trip_type(message: str, text: str, existing_data: dict) -> dict:
+    if _ROUND_TRIP_RE.search(text):
+        trip_type = 'round_trip'
+    elif _ONE_WAY_RE.search(text):
+        trip_type = 'one_way'
+    else:
+        trip_type = 'round_trip'  # Default
+    return {**existing_data, 'trip_type': trip_type}
+
+def _extract_budget(message: str, text: str, existing_data: dict) -> dict:
+    match = _BUDGET_RE.search(message)
+    if not match:
+        return existing_data
+    return {**existing_data, 'budget': match.group(1)}
+
+def _extract_preferences(message: str, text: str, existing_data: dict) -> dict:
+    # Copy the nested preferences too, the caller's dict stays untouched
+    preferences = {**(existing_data.get('preferences') or {}), 'user_input': text}
+    return {**existing_data, 'preferences': preferences}
+
+_STEP_HANDLERS = {
+    'name_collection': _extract_name,
+    'email_collection': _extract_email,
+    'destination_collection': _extract_destination,
+    'departure_location_collection': _extract_departure_location,
+    'date_collection': _extract_dates,
+    'travelers_count_collection': _extract_travelers_count,
+    'trip_type_collection': _extract_trip_type,
+    'budget_collection': _extract_budget,
+    'preferences_collection': _extract_preferences,
+}
 
 def extract_data_from_message(message: str, current_step: str, existing_data: dict) -> dict:
     """Extract relevant data from user message based on current step"""
-    data = existing_data.copy()
-    message_lower = message.lower().strip()
+    handler = _STEP_HANDLERS.get(current_step)
+    if handler is None:
+        return existing_data
     
     try:
-        if current_step == 'name_collection' and not data.get('traveler_name'):
-            # Extract name (simple approach - take the message as name)
-            data['traveler_name'] = message.strip()
-        
-        elif current_step == 'email_collection' and '@' in message:
-            # Extract email
-            words = message.split()
-            for word in words:
-                if '@' in word and '.' in word:
-                    data['traveler_email'] = word.strip()
-                    break
-        
-        elif current_step == 'destination_collection' and not data.get('destination'):
-            data['destination'] = message.strip()
-        
-        elif current_step == 'departure_location_collection' and not data.get('departure_location'):
-            data['departure_location'] = message.strip()
-        
-        elif current_step == 'date_collection':
-            # TODO: Add sophisticated date parsing.
-            if 'departure_date' not in data:
-                data['departure_date'] = message.strip()
-            elif 'return_date' not in data:
-                data['return_date'] = message.strip()
-        
-        elif current_step == 'travelers_count_collection':
-            # Extract number
-            import re
-            numbers = re.findall(r'\d+', message)
-            if numbers:
-                data['travelers_count'] = numbers[0]
-        
-        elif current_step == 'trip_type_collection':
-            if any(word in message_lower for word in ['round', 'return', 'back']):
-                data['trip_type'] = 'round_trip'
-            elif any(word in message_lower for word in ['one', 'single']):
-                data['trip_type'] = 'one_way'
-            else:
-                data['trip_type'] = 'round_trip'  # Default
-        
-        elif current_step == 'budget_collection':
-            # Extract budget
-            import re
-            amounts = re.findall(r'[\$]?(\d+)', message)
-            if amounts:
-                data['budget'] = amounts[0]
-        
-        elif current_step == 'preferences_collection':
-            if not data.get('preferences'):
-                data['preferences'] = {}
-            data['preferences']['user_input'] = message.strip()
-    
+        return handler(message, message.strip(), existing_data)
     except Exception as e:
         logger.error(f"Error extracting data from message: {e}")
-    
-    return data
+        return existing_data
+
+FLIGHT_SEARCH_REQUIRED_FIELDS = ('destination', 'departure_location', 'departure_date')
 
 def validate_flight_search_parameters(collected_data: dict) -> bool:
     """
@@ -279,34 +327,24 @@ def validate_flight_search_parameters(collected_data: dict) -> bool:
     Returns:
         bool: True if all required parameters are present and valid, False otherwise
     """
-    required_fields = {
-        'destination': str,
-        'departure_location': str,
-        'departure_date': str
-    }
-    
     # Check if all required fields are present and non-empty
-    for field, field_type in required_fields.items():
+    for field in FLIGHT_SEARCH_REQUIRED_FIELDS:
         value = collected_data.get(field)
         if not value or not str(value).strip():
             return False
             
     # Validate travel dates format (YYYY-MM-DD or YYYY-MM-DD to YYYY-MM-DD)
-    travel_dates = collected_data['departure_date'].strip()
-    date_parts = travel_dates.split(' to ')
-    
-    if len(date_parts) == 1:  # Single date
-        try:
-            datetime.strptime(date_parts[0], '%Y-%m-%d')
-        except ValueError:
+    date_parts = collected_data['departure_date'].strip().split(' to ')
+    if len(date_parts) > 2:
+        return False
+    for part in date_parts:
+        part = part.strip()
+        # fromisoformat also accepts compact and week dates, pin YYYY-MM-DD
+        if len(part) != 10 or part[4] != '-' or part[7] != '-':
             return False
-    elif len(date_parts) == 2:  # Date range
         try:
-            datetime.strptime(date_parts[0].strip(), '%Y-%m-%d')
-            datetime.strptime(date_parts[1].strip(), '%Y-%m-%d')
-        except (ValueError, IndexError):
+            date.fromisoformat(part)
+        except ValueError:
             return False
-    else:
-        return False
         
     return True
\ No newline at end of file
@@ -1,12 +1,16 @@
 from typing import Optional, Any
-import json
+import re
+import secrets
+import asyncio
+from datetime import datetime, timedelta, timezone
+import orjson
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends, Request, HTTPException, Query,Form,Body 
-from fastapi.responses import JSONResponse
-from urllib.parse import unquote
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
-from models import TripBooking
+from models import FlightOffer, TripBooking
 from database import get_db
 from mcp_travel.flight_search_mcp import FlightSearchMCP
 # Initialize router
@@ -24,17 +28,33 @@ class Flight_Search_Req(BaseModel):
 class FlightBookingRequest(BaseModel):
     user_email: str
     user_name: str
-    flight_raw_data: str
+    flight_offer_token: str
     passengers: list[dict]
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Shared across requests so the Amadeus client, and the OAuth access token
+# it caches, are reused instead of re-authenticating on every search.
+_flight_search_mcp: Optional[FlightSearchMCP] = None
+
+# Seconds a searched flight offer stays bookable. Offers are kept in the
+# flight_offers table, shared by all workers, keyed by the token the browser
+# gets in their place.
+FLIGHT_OFFER_TTL = 900
+
+def get_flight_search_mcp() -> FlightSearchMCP:
+    """Get the process-wide FlightSearchMCP, creating it on first use."""
+    global _flight_search_mcp
+    if _flight_search_mcp is None:
+        _flight_search_mcp = FlightSearchMCP()
+    return _flight_search_mcp
+
 @travel_router.post('/search_flights')
 async def search_flights(
     request: Request,
-    flight_search: Flight_Search_Req = Body()
-
+    flight_search: Flight_Search_Req = Body(),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Search for flights between two locations on specific dates.
@@ -60,15 +80,20 @@ async def search_flights(
         travel_class = flight_search.travel_class if flight_search.travel_class else "ECONOMY"
 
         
-        # Initialize the flight search client
-        flight_search_mcp = FlightSearchMCP()
-        source_IATA_codes = flight_search_mcp.get_iata_code(source, "IN")
+        # Reuse the shared flight search client
+        flight_search_mcp = get_flight_search_mcp()
+        # The two airport lookups are independent blocking Amadeus calls, run
+        # them side by side off the event loop.
+        source_IATA_codes, destination_IATA_codes = await asyncio.gather(
+            asyncio.to_thread(flight_search_mcp.get_iata_code, source, "IN"),
+            asyncio.to_thread(flight_search_mcp.get_iata_code, destination, "IN")
+        )
         soucrce_IATA = source_IATA_codes[0]['iataCode']
-        destination_IATA_codes = flight_search_mcp.get_iata_code(destination,"IN")
         destination_IATA = destination_IATA_codes[0]['iataCode']
         
         # Call the search_flights method with the provided parameters
-        flights = flight_search_mcp.search_flights(
+        flights = await asyncio.to_thread(
+            flight_search_mcp.search_flights,
             source=soucrce_IATA,
             destination=destination_IATA,
             travel_date=travel_date,
@@ -80,89 +105,138 @@ async def search_flights(
             non_stop=True,
             max_results=5  # Limit to 10 results by default
         )
-        flight_results = getJSFormat(flights)
-        return JSONResponse({
+        offer_tokens = await _store_flight_offers(db, flights)
+        # Clients that ask for NDJSON get one line per flight as it is
+        # formatted, after a header line carrying the status and count.
+        if NDJSON_MEDIA_TYPE in request.headers.get('accept', ''):
+            return StreamingResponse(_iter_ndjson_flights(flights, offer_tokens), media_type=NDJSON_MEDIA_TYPE)
+        flight_results = getJSFormat(flights, offer_tokens)
+        return ORJSONResponse({
             "status": "success",
             "flights_results": flight_results,
             "message": f"Found {len(flights)} flights"
         })
         
     except ValueError as ve:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
             content={"status": "error", "message": str(ve)}
         )
     except Exception as e:
         logger.error(f"Error searching flights: {str(e)}", exc_info=True)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"status": "error", "message": "Failed to search for flights. Please try again later."}
         )
-def getJSFormat(flights):
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# ISO 8601 flight durations as Amadeus sends them, e.g. PT2H30M or P1DT2H
+_ISO_DURATION_RE = re.compile(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?')
+
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, the form expires_at is stored in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+async def _store_flight_offers(db: AsyncSession, flights) -> list[str]:
+    """Save the offers so any worker can book them, return one token per flight in order."""
+    now = _utcnow()
+    expires_at = now + timedelta(seconds=FLIGHT_OFFER_TTL)
+    offer_tokens = [secrets.token_hex(16) for _ in flights]
+    # Clear offers that expired since the last search
+    await db.execute(delete(FlightOffer).where(FlightOffer.expires_at <= now))
+    db.add_all([
+        FlightOffer(token=token, offer=flight, expires_at=expires_at)
+        for token, flight in zip(offer_tokens, flights)
+    ])
+    await db.commit()
+    return offer_tokens
+
+def _iter_ndjson_flights(flights, offer_tokens):
+    """Yield the search result as NDJSON: a header line, then one line per flight."""
+    yield orjson.dumps({
+        "status": "success",
+        "count": len(flights),
+        "message": f"Found {len(flights)} flights"
+    }) + b"\n"
+    for flight, offer_token in zip(flights, offer_tokens):
+        yield orjson.dumps(_format_flight(flight, offer_token)) + b"\n"
+
+def getJSFormat(flights, offer_tokens):
     """
     Convert flight data from the API format to the format expected by the frontend.
     
     Args:
         flights: List of flight objects from the flight search API
+        offer_tokens: Stored offer token for each flight, in the same order
         
     Returns:
         List of flight objects in the frontend format
     """
-    formatted_flights = []
-    
-    for flight in flights:
-        # Extract the first segment (assuming non-stop flights)
-        segment = flight['itineraries'][0]['segments'][0]
-        
-        # Parse the duration string (e.g., "PT2H30M") into minutes
-        duration_str = flight['itineraries'][0]['duration']
-        hours = 0
-        minutes = 0
-        if 'H' in duration_str:
-            hours = int(duration_str.split('H')[0].split('T')[-1])
-        if 'M' in duration_str:
-            minutes = int(duration_str.split('H')[-1].split('M')[0])
-        total_minutes = hours * 60 + minutes
-        
-        formatted_flight = {
-            'id': flight['id'],
-            'airline': segment.get('carrierCode', ''),
-            'airline_name': segment.get('carrierCode', ''),  # Will be replaced with actual airline name if available
-            'flight_number': segment.get('number', ''),
-            'aircraft': segment.get('aircraft', {}).get('code', ''),
-            'departure_airport': segment['departure']['iataCode'],
-            'arrival_airport': segment['arrival']['iataCode'],
-            'departure_time': segment['departure']['at'],
-            'arrival_time': segment['arrival']['at'],
-            'duration': total_minutes,
-            'price': float(flight['price']['total']),
-            'currency': flight['price']['currency'],
-            'stops': len(flight['itineraries'][0]['segments']) - 1,
-            'raw': json.dumps(flight)
-        }
+    return [_format_flight(flight, offer_token) for flight, offer_token in zip(flights, offer_tokens)]
 
-        # Try to get airline name from the operating carrier if available
-        operating = segment.get('operating', {})
-        if 'carrierCode' in operating:
-            formatted_flight['airline_name'] = operating['carrierCode']
-        
-        formatted_flights.append(formatted_flight)
+def _format_flight(flight, offer_token):
+    """Convert one flight offer from the API format to the frontend format."""
+    itinerary = flight['itineraries'][0]
+    segments = itinerary['segments']
+    # Extract the first segment (assuming non-stop flights)
+    segment = segments[0]
+    departure = segment['departure']
+    arrival = segment['arrival']
+    price = flight['price']
+    carrier = segment.get('carrierCode', '')
+    
+    # Parse the duration string (e.g., "PT2H30M") into minutes
+    match = _ISO_DURATION_RE.match(itinerary['duration'])
+    days, hours, minutes = match.groups() if match else (None, None, None)
+    total_minutes = int(days or 0) * 1440 + int(hours or 0) * 60 + int(minutes or 0)
+    
+    # Prefer the operating carrier for the airline name when available
+    operating = segment.get('operating', {})
     
-    return formatted_flights
+    return {
+        'id': flight['id'],
+        'airline': carrier,
+        'airline_name': operating.get('carrierCode', carrier),
+        'flight_number': segment.get('number', ''),
+        'aircraft': segment.get('aircraft', {}).get('code', ''),
+        'departure_airport': departure['iataCode'],
+        'arrival_airport': arrival['iataCode'],
+        'departure_time': departure['at'],
+        'arrival_time': arrival['at'],
+        'duration': total_minutes,
+        'price': float(price['total']),
+        'currency': price['currency'],
+        'stops': len(segments) - 1,
+        # The offer stays server side, the client only carries its token
+        'offer_token': offer_token
+    }
 
 
 
+# Booking list rows come straight from the columns, the dates formatted as
+# ISO strings by SQLite's strftime so no ORM objects or date values are built.
+_BOOKING_ISO_FORMATS = {
+    'departure_date': '%Y-%m-%d',
+    'return_date': '%Y-%m-%d',
+    'created_at': '%Y-%m-%dT%H:%M:%S',
+}
+_BOOKING_LIST_QUERY = (
+    select(*(
+        func.strftime(_BOOKING_ISO_FORMATS[name], getattr(TripBooking, name)).label(name)
+        if name in _BOOKING_ISO_FORMATS else getattr(TripBooking, name)
+        for name in TripBooking._DICT_FIELDS
+    ))
+    .order_by(TripBooking.created_at.desc())
+    .limit(100)
+)
+
 @travel_router.get('/bookings')
 async def get_bookings(db: AsyncSession = Depends(get_db)):
     """Get user's booking history"""
     try:
         # In a real app, you would filter by the current user
-        result = await db.execute("""
-            SELECT * FROM tripbooking
-            ORDER BY created_at DESC
-            LIMIT 100
-        """)
-        bookings = result.mappings().all()
+        result = await db.execute(_BOOKING_LIST_QUERY)
+        bookings = [dict(row) for row in result.mappings()]
         return {"status": "success", "data": bookings}
     except Exception as e:
         logger.error(f"Error fetching bookings: {str(e)}")
@@ -172,14 +246,12 @@ async def get_bookings(db: AsyncSession = Depends(get_db)):
 async def get_booking(booking_id: int, db: AsyncSession = Depends(get_db)):
     """Get specific booking details"""
     try:
-        result = await db.execute(
-            "SELECT * FROM tripbooking WHERE id = :booking_id",
-            {"booking_id": booking_id}
-        )
-        booking = result.mappings().first()
+        booking = await db.get(TripBooking, booking_id)
         if not booking:
             raise HTTPException(status_code=404, detail="Booking not found")
-        return {"status": "success", "data": booking}
+        return {"status": "success", "data": booking.to_dict()}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching booking {booking_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch booking")
@@ -190,14 +262,18 @@ async def cancel_booking(booking_id: int, db: AsyncSession = Depends(get_db)):
     try:
         # In a real app, you would verify the user owns this booking
         result = await db.execute(
-            "UPDATE tripbooking SET booking_status = 'cancelled' WHERE id = :booking_id RETURNING *",
-            {"booking_id": booking_id}
+            update(TripBooking)
+            .where(TripBooking.id == booking_id)
+            .values(booking_status='cancelled')
+            .returning(TripBooking.id)
         )
-        booking = result.mappings().first()
-        if not booking:
+        if result.scalar_one_or_none() is None:
             raise HTTPException(status_code=404, detail="Booking not found")
         await db.commit()
         return {"status": "success", "message": "Booking cancelled"}
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
         await db.rollback()
         logger.error(f"Error cancelling booking {booking_id}: {str(e)}")
@@ -228,8 +304,14 @@ async def book_flight(
         import random
         import string
         pnr = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        flight_data= (json.loads(unquote(booking_request.flight_raw_data)) if booking_request.flight_raw_data else None ) ,
-        passengers=json.dumps(booking_request.passengers),
+        offer = await db.get(FlightOffer, booking_request.flight_offer_token)
+        if offer is None or offer.expires_at <= _utcnow():
+            return ORJSONResponse(
+                status_code=400,
+                content={"status": "error", "message": "The selected flight has expired. Please search again."}
+            )
+        flight_data = offer.offer
+        passengers = booking_request.passengers
         # Prepare response with booking details
         response = {
             "status": "success",
@@ -246,12 +328,12 @@ async def book_flight(
             }
         }
         
-        return JSONResponse(response)
+        return ORJSONResponse(response)
         
     except Exception as e:
         logger.error(f"Error booking flight: {str(e)}", exc_info=True)
         await db.rollback()
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"status": "error", "message": "Failed to process booking. Please try again."}
         )
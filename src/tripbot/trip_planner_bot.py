@@ -3,7 +3,9 @@ Trip Planner Bot module for handling conversation flow and response generation.
 """
 import os
 import json
+import hashlib
 import logging
+import orjson
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 from sqlalchemy import false, true
@@ -20,27 +22,42 @@ from llm_adapters import (
     TOOL_PARAMETERS_KEY
 )
 from mcp_travel.mcp_utils import parseDate
+from cache_utils import TTLCache
 
 logger = logging.getLogger(__name__)
 
 class TripPlannerBot:
     """Main trip planner bot with conversation management"""
+
+    # Fields that must be filled before a flight search can run
+    _FLIGHT_SEARCH_FIELDS = ('destination', 'departure_location', 'travel_dates')
     
-    def __init__(self, preferred_llm: str = "bedrock"):
+    def __init__(self, preferred_llm: str = "bedrock", enable_cache: bool = False, cache_size: int = 1024, cache_ttl: float = 300):
+        """
+        Args:
+            preferred_llm: LLM provider, "bedrock" or "bedrock_chain"
+            enable_cache: Reuse the LLM reply for an identical opening message at
+                          the same step and with the same collected data
+            cache_size: Number of distinct opening turns kept when caching is enabled
+            cache_ttl: Seconds a cached reply stays valid
+        """
         self.preferred_llm = preferred_llm.lower()
+        self._response_cache = TTLCache(cache_size, cache_ttl) if enable_cache else None
         self.openai_adapter = None
         self.gemini_adapter = None
         self.bedrock_adapter = None
         self.bedrock_lang_chain_adapter = None
         
-        # Initialize only the requested adapter
+        # Initialize only the requested adapter and resolve it once for every turn
         if self.preferred_llm == "bedrock":
             self.bedrock_adapter = BedrockLlamaAdapter()
-            self.response_parser = BedrockLlamaResponseParser()
+            self._adapter = self.bedrock_adapter
         elif self.preferred_llm == "bedrock_chain":
             self.bedrock_lang_chain_adapter = BedrockLangChainLlamaAdapter()
+            self._adapter = self.bedrock_lang_chain_adapter
         else:
             raise ValueError(f"Unsupported LLM provider: {preferred_llm}")
+        self.response_parser = BedrockLlamaResponseParser()
         
         # Conversation flow steps
         self.conversation_steps = [
@@ -52,6 +69,8 @@ class TripPlannerBot:
             # "payment_collection",
             # "final_confirmation"
         ]
+        # Step name -> position, for constant time lookups per turn
+        self._step_index = {step: index for index, step in enumerate(self.conversation_steps)}
         # Load prompts from files
         self.prompts_dir = os.path.join(os.path.dirname(__file__), "prompts")
         self.system_prompt = self._load_prompt("system_prompt.txt")
@@ -59,6 +78,12 @@ class TripPlannerBot:
             step: self._load_prompt(f"{step}.txt")
             for step in self.conversation_steps
         }
+        # The context prompt is the system prompt plus at most one step prompt,
+        # so every variant is built once here, keyed by the step prompt text.
+        self._context_prompts = {
+            step_prompt: self.system_prompt + step_prompt
+            for step_prompt in (*self.step_prompts.values(), "")
+        }
         self.guideLines = self._load_prompt("guardContent.txt")
         self.bot_response_format = self._load_prompt("bot_response_format.txt")
         self.result_format = {
@@ -76,26 +101,85 @@ class TripPlannerBot:
             with open(filepath, 'r', encoding='utf-8') as f:
                 return f.read()
         except Exception as e:
-            logger.error(f"Error loading prompt {filename}: {str(e)}")
+            logger.error("Error loading prompt %s: %s", filename, e)
             return ""
 
     def get_adapter(self):
         """Get the appropriate LLM adapter"""
-        if self.preferred_llm == "bedrock":
-            return self.bedrock_adapter
-        elif self.preferred_llm == "gemini":
-            return self.gemini_adapter
-        elif self.preferred_llm == "openai":
-            return self.openai_adapter
-        elif self.preferred_llm == "bedrock_chain":
-            return self.bedrock_lang_chain_adapter
+        return self._adapter
+
+    def warm_up(self) -> None:
+        """Create the shared LLM client now, so the first chat turn does not pay for it"""
+        try:
+            client = self._adapter._get_client()
+        except Exception:
+            client = None
+        if client is None:
+            logger.warning("LLM client unavailable at startup, it will be created on first use")
         else:
-            raise ValueError(f"Unsupported LLM provider: {self.preferred_llm}")
+            logger.info("LLM client %#x shared by all requests", id(client))
 
     def generate_response(self, user_message: str, conversation_history: list, current_step: str, collected_data: dict, booking_service=None):
         """Generate bot response and determine next step"""
-        adapter = self.get_adapter()
-        
+        cache_key = self._response_cache_key(user_message, conversation_history, current_step, collected_data)
+        response = self._response_cache.get(cache_key) if cache_key else None
+        if response is None:
+            adapter = self.get_adapter()
+            messages, adapter_system_prompt = self._prepare_llm_request(
+                adapter, user_message, conversation_history, current_step, collected_data
+            )
+            # Get response from the LLM with tool support
+            response = adapter.generate_response(messages, adapter_system_prompt)
+            self._store_cached_response(cache_key, response)
+        return self._process_llm_response(response, current_step, collected_data)
+
+    async def agenerate_response(self, user_message: str, conversation_history: list, current_step: str, collected_data: dict, booking_service=None):
+        """
+        Async variant of generate_response for request handlers.
+
+        The LLM call is awaited through the adapter's agenerate_response, so the
+        event loop keeps serving other chats while Bedrock is generating.
+        """
+        cache_key = self._response_cache_key(user_message, conversation_history, current_step, collected_data)
+        response = self._response_cache.get(cache_key) if cache_key else None
+        if response is None:
+            adapter = self.get_adapter()
+            messages, adapter_system_prompt = self._prepare_llm_request(
+                adapter, user_message, conversation_history, current_step, collected_data
+            )
+            response = await adapter.agenerate_response(messages, adapter_system_prompt)
+            self._store_cached_response(cache_key, response)
+        return self._process_llm_response(response, current_step, collected_data)
+
+    def _response_cache_key(self, user_message: str, conversation_history: list, current_step: str, collected_data: dict) -> Optional[bytes]:
+        """
+        Cache key for a turn whose reply only depends on the message, step and data.
+
+        Only opening turns qualify, later turns depend on the whole history.
+        The session timestamp is left out so the same greeting matches across
+        sessions.
+
+        Returns:
+            bytes or None: Digest of the normalized turn, None when not cacheable
+        """
+        if self._response_cache is None or conversation_history:
+            return None
+        key_data = {
+            "step": current_step,
+            "msg": " ".join(user_message.lower().split()),
+            "data": {key: value for key, value in collected_data.items() if key != 'timestamp'},
+        }
+        return hashlib.blake2b(
+            orjson.dumps(key_data, option=orjson.OPT_SORT_KEYS, default=str), digest_size=16
+        ).digest()
+
+    def _store_cached_response(self, cache_key: Optional[bytes], response) -> None:
+        """Cache a raw LLM reply, error replies carry no 'output' and are skipped"""
+        if cache_key and isinstance(response, dict) and 'output' in response:
+            self._response_cache.put(cache_key, response)
+
+    def _prepare_llm_request(self, adapter, user_message: str, conversation_history: list, current_step: str, collected_data: dict):
+        """Build the messages and adapter specific system prompt for one turn"""
         # Prepare messages for the LLM
         messages = []
         
@@ -112,13 +196,15 @@ class TripPlannerBot:
         
         # build adapter specific prompt
         adapter_system_prompt = adapter.build_system_prompt(context_prompt, self.guideLines, bot_response_format)
-        logger.debug(f"calling generate with following prompt {adapter_system_prompt} and message {messages}")
-        # Get response from the LLM with tool support
-        response = adapter.generate_response(messages, adapter_system_prompt)
-        logger.debug(f"Response from LLM: {response}")
+        logger.debug("calling generate with following prompt %s and message %s", adapter_system_prompt, messages)
+        return messages, adapter_system_prompt
+
+    def _process_llm_response(self, response, current_step: str, collected_data: dict):
+        """Extract the response elements, merge new data and pick the next step"""
+        logger.debug("Response from LLM: %s", response)
         # Extract response elements
         response_elements = self.extract_response_elements(response)
-        logger.debug(f"Response elements: {response_elements}")
+        logger.debug("Response elements: %s", response_elements)
         
         # Update collected data if any new data is provided in the response
         if USER_DATA_KEY in response_elements and response_elements[USER_DATA_KEY]:
@@ -161,19 +247,19 @@ class TripPlannerBot:
             str: JSON string representing the merged format
         """
         # Create a deep copy to avoid modifying the original
-        logger.debug(f"Building bot response format with collected data: {collected_data}")
+        logger.debug("Building bot response format with collected data: %s", collected_data)
         merged = result_format.copy()
         merged[USER_DATA_KEY] = collected_data
-        logger.debug(f"Merged bot response format: {merged}")
+        logger.debug("Merged bot response format: %s", merged)
 
         bot_format_preamble = f"Respond in JSON and fill {USER_DATA_KEY}\n\n"
-        bot_format_preamble += json.dumps(merged, indent=2)
+        bot_format_preamble += orjson.dumps(merged, option=orjson.OPT_INDENT_2, default=str).decode()
         return bot_format_preamble
         
     def _format_conversation_history(self, conversation_history: list, collected_data: dict) -> list:
         """
         Format conversation history into message dictionaries with appropriate roles.
-        If a message has a defined role, use it. Otherwise, alternate between user and assistant.
+        History is stored as role/content dictionaries, entries without a role are skipped.
         For assistant messages in JSON format, extract the question if available.
         
         Args:
@@ -185,20 +271,20 @@ class TripPlannerBot:
         """
         formatted_messages = []
         
-        for i, msg in enumerate(conversation_history):
+        for msg in conversation_history:
             # If message is a dictionary with a defined role, use it
             if isinstance(msg, dict) and 'role' in msg:
-                role = msg['role']
+                role = msg['role'].lower()
                 content = msg.get('content', '')
                 
                 # For assistant messages, validate and process content
                 if role == 'assistant':
                     try:
-                        content_json = None
+                        content_json = content if isinstance(content, dict) else None
                         # If content is a string, try to parse it as JSON
                         if isinstance(content, str):
                             try:
-                                content_json = json.loads(content)
+                                content_json = orjson.loads(content)
                             except json.JSONDecodeError:
                                 pass  # Not JSON, keep as string
                         
@@ -210,13 +296,16 @@ class TripPlannerBot:
                             elif content_json.get(BOT_TEXT_RESPONSE_KEY):
                                 content = content_json.get(BOT_TEXT_RESPONSE_KEY)
                     except Exception as e:
-                        logger.warning(f"Error processing assistant message content: {e}")
+                        logger.warning("Error processing assistant message content: %s", e)
+                    # Bedrock only accepts text content, never a raw dict
+                    if not isinstance(content, str):
+                        content = orjson.dumps(content, default=str).decode()
                 # For non-assistant messages or if content isn't a string, ensure proper serialization
                 elif not isinstance(content, str):
                     try:
-                        content = json.dumps(content)
-                    except (TypeError, ValueError) as e:
-                        logger.warning(f"Failed to serialize message content: {e}")
+                        content = orjson.dumps(content).decode()
+                    except TypeError as e:
+                        logger.warning("Failed to serialize message content: %s", e)
                         content = str(content)
                     
                 formatted_messages.append({
@@ -234,8 +323,11 @@ class TripPlannerBot:
         #     #     if value:
         #     #         data_summary += f"- {key.replace('_', ' ').title()}: {value}\n"
         #     # base_prompt += f"\n\n{data_summary}"
-        base_prompt += self.determine_next_action_prompt(collected_data, messages)
-        return base_prompt
+        next_action_prompt = self.determine_next_action_prompt(collected_data, messages)
+        context_prompt = self._context_prompts.get(next_action_prompt)
+        if context_prompt is None:
+            context_prompt = base_prompt + next_action_prompt
+        return context_prompt
 
     def isGreetingPrompt(self, collected_data: dict, messages: list) -> bool:
         """
@@ -291,8 +383,7 @@ class TripPlannerBot:
             bool: True if all required flight search fields are present and non-empty, False otherwise
         """
         #TODO: Manage return journey ?
-        required_fields = ['destination', 'departure_location', 'travel_dates']
-        return all(collected_data.get(field, '').strip() for field in required_fields)
+        return all(collected_data.get(field, '').strip() for field in self._FLIGHT_SEARCH_FIELDS)
 
     def update_collected_data(self, collected_data: dict, updated_data: dict) -> None:
         """
@@ -334,10 +425,10 @@ class TripPlannerBot:
     def _determine_next_step(self, current_step: str, user_message: str, collected_data: dict) -> str:
         """Determine the next conversation step based on current state and user input"""
         # This is a simplified implementation. You can expand this based on your state machine logic.
-        if not current_step or current_step not in self.conversation_steps:
+        current_index = self._step_index.get(current_step)
+        if current_index is None:
             return self.conversation_steps[0]  # Start from the beginning
             
-        current_index = self.conversation_steps.index(current_step)
         # if(_is_flight_search_result_available(collected_data)):
         #     return self.conversation_steps[current_index + 1]
         
@@ -395,9 +486,10 @@ def main():
                 current_step=current_step,
                 collected_data=collected_data
             )
-            logger.debug(f"Next Step: {next_step}")
-            logger.debug(f"Response:\n{json.dumps(bot_response, indent=2, default=str)}")
-            logger.debug(f"Updated Data:\n{json.dumps(updated_data, indent=2, default=str)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Next Step: %s", next_step)
+                logger.debug("Response:\n%s", json.dumps(bot_response, indent=2, default=str))
+                logger.debug("Updated Data:\n%s", json.dumps(updated_data, indent=2, default=str))
             # Update conversation state with custom merge that preserves non-empty values
             current_step = next_step
             bot.update_collected_data(collected_data, updated_data or {})
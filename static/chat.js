@@ -487,7 +487,7 @@ class TripBotChat {
                         <div class="card mb-2 flight-option ${selectedFlight === index ? 'border-primary' : ''}" 
                              data-index="${index}" 
                              style="cursor: pointer;">
-                             <input type="hidden" id="flight-raw-data-${index}" class="flight-raw-data" value='${JSON.stringify(flight.raw).replace(/'/g, "&apos;")}'>
+                             <input type="hidden" id="flight-offer-token-${index}" class="flight-offer-token" value='${flight.offer_token}'>
                             <div class="card-body p-2">
                                 <div class="d-flex justify-content-between align-items-center">
                                     <div>
@@ -562,7 +562,7 @@ class TripBotChat {
             const flightData = {
                 selected: true,
                 flightIndex: selectedFlight,
-                raw_search_data: encodeURIComponent(JSON.stringify(JSON.parse(document.getElementById(`flight-raw-data-${selectedFlight}`).value)))
+                offer_token: document.getElementById(`flight-offer-token-${selectedFlight}`).value
                 // Add any other relevant flight data here
             };
             
@@ -589,7 +589,7 @@ class TripBotChat {
         bookingForm.innerHTML = `
             <h5 class="mb-3 text-dark">Complete Your Booking</h5>
             <form id="bookingForm">
-                <input type="hidden" name="flight_raw_data" value='${flightData.raw_search_data}'/>
+                <input type="hidden" name="flight_offer_token" value='${flightData.offer_token}'/>
                 
                 <div class="mb-3">
                     <label class="form-label fw-bold text-dark">Full Name</label>
@@ -650,7 +650,7 @@ class TripBotChat {
             const bookingData = {
                 user_name: formData.get('user_name'),
                 user_email: formData.get('user_email'),
-                flight_raw_data: formData.get('flight_raw_data'),
+                flight_offer_token: formData.get('flight_offer_token'),
                 passengers: passengers
             };
     
@@ -723,7 +723,9 @@ class TripBotChat {
 // Global functions
 function resetChat() {
     if (confirm('Are you sure you want to start a new conversation? All current progress will be lost.')) {
-        fetch('/api/reset', { method: 'POST' })
+        const sessionId = sessionStorage.getItem('sessionId') || '';
+        sessionStorage.removeItem('sessionId');
+        fetch('/api/reset', { method: 'POST', headers: { 'x-session-id': sessionId } })
             .then(() => {
                 location.reload();
             })
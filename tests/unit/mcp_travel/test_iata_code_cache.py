@@ -0,0 +1,55 @@
+"""Unit tests for the IATA code lookup cache."""
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, project_root)
+
+from src.mcp_travel.flight_search_mcp import FlightSearchMCP
+
+
+class TestIataCodeCache(unittest.TestCase):
+    """Test cases for caching of get_iata_code lookups."""
+
+    def setUp(self):
+        """Set up a FlightSearchMCP whose locations endpoint is mocked."""
+        self.client = MagicMock()
+        self.locations = self.client.reference_data.locations.get
+        self.locations.return_value = MagicMock(
+            data=[{'name': 'DELHI', 'iataCode': 'DEL'}]
+        )
+        self.flight_search = FlightSearchMCP(client=self.client)
+
+    def test_repeated_lookup_is_served_from_cache(self):
+        """A second lookup of the same keyword does not call the API."""
+        first = self.flight_search.get_iata_code('Delhi', 'IN')
+        second = self.flight_search.get_iata_code('Delhi', 'IN')
+        self.assertEqual(first, [{'name': 'DELHI', 'iataCode': 'DEL'}])
+        self.assertEqual(second, first)
+        self.assertEqual(self.locations.call_count, 1)
+
+    def test_keyword_is_normalized(self):
+        """Case and surrounding whitespace do not cause a new lookup."""
+        self.flight_search.get_iata_code('Delhi', 'IN')
+        self.flight_search.get_iata_code('  delhi ', 'IN')
+        self.assertEqual(self.locations.call_count, 1)
+
+    def test_country_code_is_part_of_the_key(self):
+        """The same keyword in another country is looked up separately."""
+        self.flight_search.get_iata_code('Delhi', 'IN')
+        self.flight_search.get_iata_code('Delhi', 'US')
+        self.assertEqual(self.locations.call_count, 2)
+
+    def test_empty_result_is_not_cached(self):
+        """A lookup that found nothing is retried on the next call."""
+        self.locations.return_value = MagicMock(data=[])
+        self.assertEqual(self.flight_search.get_iata_code('Nowhere', 'IN'), [])
+        self.flight_search.get_iata_code('Nowhere', 'IN')
+        self.assertEqual(self.locations.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Unit tests for the TTLCache helper."""
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add src and the tripbot package to the Python path, as gunicorn.conf.py does
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'tripbot'))
+
+import cache_utils
+from cache_utils import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test cases for expiry and LRU eviction of TTLCache."""
+
+    def setUp(self):
+        """Drive the cache clock by hand instead of sleeping."""
+        self.now = 1000.0
+        patcher = patch.object(cache_utils.time, 'monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_miss_returns_none(self):
+        self.assertIsNone(TTLCache(2, 60).get('missing'))
+
+    def test_entry_expires_after_ttl(self):
+        cache = TTLCache(2, 60)
+        cache.put('a', 1)
+        self.now += 59.9
+        self.assertEqual(cache.get('a'), 1)
+        self.now += 0.1
+        self.assertIsNone(cache.get('a'))
+        self.assertNotIn('a', cache._entries)
+
+    def test_get_does_not_extend_ttl(self):
+        """Expiry counts from insertion, reads do not push it back."""
+        cache = TTLCache(2, 60)
+        cache.put('a', 1)
+        self.now += 50
+        self.assertEqual(cache.get('a'), 1)
+        self.now += 10
+        self.assertIsNone(cache.get('a'))
+
+    def test_put_resets_ttl(self):
+        cache = TTLCache(2, 60)
+        cache.put('a', 1)
+        self.now += 50
+        cache.put('a', 2)
+        self.now += 50
+        self.assertEqual(cache.get('a'), 2)
+
+    def test_evicts_least_recently_used_at_maxsize(self):
+        cache = TTLCache(2, 60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 2)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache._entries), 2)
+
+    def test_get_refreshes_recency(self):
+        """A read entry survives the next eviction, the untouched one goes."""
+        cache = TTLCache(2, 60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_put_refreshes_recency(self):
+        cache = TTLCache(2, 60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.put('a', 10)
+        cache.put('c', 3)
+        self.assertEqual(cache.get('a'), 10)
+        self.assertIsNone(cache.get('b'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Unit tests for extracting trip data from chat messages."""
+import unittest
+import sys
+import os
+
+# Add src and the tripbot package to the Python path, as gunicorn.conf.py does
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'tripbot'))
+
+from routes import extract_data_from_message
+
+
+class TestTripTypeExtraction(unittest.TestCase):
+    """Test cases for the trip_type_collection step."""
+
+    def extract_trip_type(self, message):
+        return extract_data_from_message(message, 'trip_type_collection', {})['trip_type']
+
+    def test_one_way_phrasings(self):
+        """One-way answers, in the spellings users type."""
+        for message in ['One way please', 'I want a oneway ticket', 'one-way', 'ONE WAY', 'single']:
+            with self.subTest(message=message):
+                self.assertEqual(self.extract_trip_type(message), 'one_way')
+
+    def test_round_trip_phrasings(self):
+        """Round trip answers."""
+        for message in ['Round trip', 'with a return', 'and back', 'RETURN']:
+            with self.subTest(message=message):
+                self.assertEqual(self.extract_trip_type(message), 'round_trip')
+
+    def test_keywords_inside_other_words_do_not_match(self):
+        """'one' inside 'someone' is not a one-way answer, the default applies."""
+        self.assertEqual(self.extract_trip_type('someone else decides'), 'round_trip')
+
+    def test_unclear_answer_defaults_to_round_trip(self):
+        """Without a keyword the trip is treated as round trip."""
+        self.assertEqual(self.extract_trip_type('not sure yet'), 'round_trip')
+
+
+class TestStepExtraction(unittest.TestCase):
+    """Test cases for the per-step handlers of extract_data_from_message."""
+
+    def setUp(self):
+        """Collected data as a fresh session holds it, every field present but empty."""
+        self.existing = {
+            'traveler_name': '', 'email': '', 'destination': '', 'departure_location': '',
+            'departure_date': '', 'return_date': '', 'travelers_count': '', 'trip_type': '',
+            'budget': '', 'preferences': {}
+        }
+
+    def assertExtracted(self, message, step, expected):
+        """Check the fields the step adds or changes, and that the input is untouched."""
+        before = dict(self.existing)
+        data = extract_data_from_message(message, step, self.existing)
+        self.assertEqual(self.existing, before)
+        self.assertIsNot(data, self.existing)
+        for field, value in expected.items():
+            self.assertEqual(data[field], value)
+
+    def test_name(self):
+        self.assertExtracted('  Asha Rao ', 'name_collection', {'traveler_name': 'Asha Rao'})
+
+    def test_email(self):
+        self.assertExtracted('mail me at asha.rao@example.com, thanks', 'email_collection',
+                             {'traveler_email': 'asha.rao@example.com'})
+
+    def test_destination(self):
+        self.assertExtracted('Goa ', 'destination_collection', {'destination': 'Goa'})
+
+    def test_departure_location(self):
+        self.assertExtracted('Delhi', 'departure_location_collection', {'departure_location': 'Delhi'})
+
+    def test_departure_then_return_date(self):
+        self.assertExtracted('2025-12-20', 'date_collection', {'departure_date': '2025-12-20', 'return_date': ''})
+        self.existing['departure_date'] = '2025-12-20'
+        self.assertExtracted('2025-12-27', 'date_collection', {'departure_date': '2025-12-20', 'return_date': '2025-12-27'})
+
+    def test_travelers_count(self):
+        self.assertExtracted('we are 3 adults', 'travelers_count_collection', {'travelers_count': '3'})
+
+    def test_budget(self):
+        self.assertExtracted('around $1500', 'budget_collection', {'budget': '1500'})
+
+    def test_preferences(self):
+        self.existing['preferences'] = {'meal': 'veg'}
+        self.assertExtracted(' window seat ', 'preferences_collection',
+                             {'preferences': {'meal': 'veg', 'user_input': 'window seat'}})
+        self.assertEqual(self.existing['preferences'], {'meal': 'veg'})
+
+    def test_nothing_extracted_returns_input_unchanged(self):
+        """Steps with nothing to store hand back the same, unmodified dict."""
+        existing = {'traveler_name': 'Asha', 'destination': 'Goa',
+                    'departure_date': '2025-12-20', 'return_date': '2025-12-27'}
+        before = dict(existing)
+        cases = [
+            ('Someone else', 'name_collection'),
+            ('no address here', 'email_collection'),
+            ('Paris', 'destination_collection'),
+            ('2026-01-01', 'date_collection'),
+            ('no digits', 'travelers_count_collection'),
+            ('no idea', 'budget_collection'),
+            ('hello', 'greeting'),
+        ]
+        for message, step in cases:
+            with self.subTest(step=step):
+                self.assertIs(extract_data_from_message(message, step, existing), existing)
+                self.assertEqual(existing, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
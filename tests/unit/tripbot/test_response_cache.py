@@ -0,0 +1,94 @@
+"""Unit tests for the TripPlannerBot opening turn response cache."""
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add src and the tripbot package to the Python path, as gunicorn.conf.py does
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'tripbot'))
+
+from trip_planner_bot import TripPlannerBot
+
+GREETING_REPLY = {'output': {'message': {'role': 'assistant', 'content': [
+    {'text': '{"response": "Hi! Where would you like to fly?", "question": "", "UserData": {}}'}
+]}}}
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for _response_cache_key and _store_cached_response."""
+
+    def setUp(self):
+        """Bot with caching on and a mocked adapter, so no Bedrock call is made."""
+        self.bot = TripPlannerBot(enable_cache=True)
+        self.adapter = MagicMock()
+        self.adapter.generate_response.return_value = GREETING_REPLY
+        self.bot._adapter = self.adapter
+
+    def collected(self, **overrides):
+        """Collected data as a fresh session holds it."""
+        data = {'destination': '', 'departure_location': '', 'timestamp': '2025-12-01T10:00:00'}
+        data.update(overrides)
+        return data
+
+    def key(self, message='Hello', history=None, step='greeting', data=None):
+        return self.bot._response_cache_key(message, history or [], step,
+                                            self.collected() if data is None else data)
+
+    def test_identical_opening_turn_hits_cache(self):
+        for _ in range(2):
+            response, next_step, _ = self.bot.generate_response('Hello', [], 'greeting', self.collected())
+            self.assertEqual(response['response'], None)
+            self.assertEqual(response['question'], 'Hi! Where would you like to fly?')
+        self.assertEqual(self.adapter.generate_response.call_count, 1)
+
+    def test_message_is_normalized(self):
+        """Case and whitespace differences share a key."""
+        self.assertEqual(self.key('Hello  there'), self.key('  hello THERE '))
+
+    def test_timestamp_is_not_part_of_key(self):
+        self.assertEqual(self.key(data=self.collected(timestamp='2025-12-01T10:00:00')),
+                         self.key(data=self.collected(timestamp='2026-03-15T18:30:00')))
+        self.assertEqual(self.key(data=self.collected()),
+                         self.key(data={'destination': '', 'departure_location': ''}))
+
+    def test_different_collected_data_misses(self):
+        base = self.key()
+        for data in [self.collected(destination='Goa'), self.collected(budget='1500'),
+                     {'destination': '', 'timestamp': '2025-12-01T10:00:00'}]:
+            with self.subTest(data=data):
+                self.assertNotEqual(self.key(data=data), base)
+
+    def test_different_message_or_step_misses(self):
+        base = self.key()
+        self.assertNotEqual(self.key(message='Hi'), base)
+        self.assertNotEqual(self.key(step='flight_search'), base)
+
+    def test_turn_with_history_is_not_cached(self):
+        history = [{'role': 'user', 'content': 'Hello'}, {'role': 'assistant', 'content': 'Hi!'}]
+        self.assertIsNone(self.key(history=history))
+        for _ in range(2):
+            self.bot.generate_response('Hello', history, 'greeting', self.collected())
+        self.assertEqual(self.adapter.generate_response.call_count, 2)
+
+    def test_changed_collected_data_calls_model(self):
+        self.bot.generate_response('Hello', [], 'greeting', self.collected())
+        self.bot.generate_response('Hello', [], 'greeting', self.collected(destination='Goa'))
+        self.assertEqual(self.adapter.generate_response.call_count, 2)
+
+    def test_error_reply_is_not_stored(self):
+        """Adapter error replies carry no 'output' and are retried next time."""
+        self.adapter.generate_response.return_value = {'response': 'Please try again later.'}
+        for _ in range(2):
+            self.bot.generate_response('Hello', [], 'greeting', self.collected())
+        self.assertEqual(self.adapter.generate_response.call_count, 2)
+
+    def test_cache_disabled_by_default(self):
+        bot = TripPlannerBot()
+        self.assertIsNone(bot._response_cache_key('Hello', [], 'greeting', self.collected()))
+        bot._store_cached_response(None, GREETING_REPLY)
+
+
+if __name__ == "__main__":
+    unittest.main()
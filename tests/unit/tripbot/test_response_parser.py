@@ -0,0 +1,148 @@
+"""Unit tests for parsing Bedrock replies into the bot format."""
+import importlib.util
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add src and the tripbot package to the Python path, as gunicorn.conf.py does
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'tripbot'))
+
+import llm_adapters
+from llm_adapters import BedrockLlamaResponseParser, _try_parse_json_prefix
+
+
+def converse_reply(text):
+    """Converse API response carrying a single text block."""
+    return {'output': {'message': {'role': 'assistant', 'content': [{'text': text}]}}}
+
+
+class TestTryParseJsonPrefix(unittest.TestCase):
+    """Test cases for locating the JSON object in a model reply."""
+
+    def test_clean_object(self):
+        self.assertEqual(_try_parse_json_prefix('{"response": "ok"}'), ({'response': 'ok'}, ''))
+
+    def test_prose_before_object(self):
+        """The text before the object comes back stripped."""
+        self.assertEqual(_try_parse_json_prefix('Sure! {"response": "ok"}'), ({'response': 'ok'}, 'Sure!'))
+
+    def test_text_after_object_is_ignored(self):
+        self.assertEqual(_try_parse_json_prefix('{"response": "ok"} Hope that helps'), ({'response': 'ok'}, ''))
+
+    def test_stray_braces_before_object(self):
+        """A brace in the prose is skipped and decoding resumes at the next one."""
+        parsed, prefix = _try_parse_json_prefix('Use {city} as the key: {"response": "ok"}')
+        self.assertEqual(parsed, {'response': 'ok'})
+        self.assertEqual(prefix, 'Use {city} as the key:')
+
+    def test_no_object(self):
+        text = 'Where would you like to go?'
+        self.assertEqual(_try_parse_json_prefix(text), (None, text))
+
+    def test_unparseable_object(self):
+        """A broken object hands back the whole text."""
+        text = '{"response": "ok",'
+        with self.assertLogs('llm_adapters', level='WARNING'):
+            self.assertEqual(_try_parse_json_prefix(text), (None, text))
+
+
+class TestJsonPrefixFallbacks(unittest.TestCase):
+    """Test cases for the bounded retries and the optional json5 fallback."""
+
+    # One more stray brace than _JSON_PREFIX_ATTEMPTS, the object is never reached
+    TOO_MANY_BRACES = 'Pick {a}, {b}, {c}, {d} or {e}: {"response": "ok"}'
+
+    def test_all_attempts_fail(self):
+        self.assertEqual(llm_adapters._JSON_PREFIX_ATTEMPTS, 4)
+        with self.assertLogs('llm_adapters', level='WARNING'):
+            self.assertEqual(_try_parse_json_prefix(self.TOO_MANY_BRACES), (None, self.TOO_MANY_BRACES))
+
+    def test_object_within_attempts(self):
+        """Three stray braces leave the fourth attempt for the object."""
+        parsed, prefix = _try_parse_json_prefix('Pick {a}, {b} or {c}: {"response": "ok"}')
+        self.assertEqual(parsed, {'response': 'ok'})
+        self.assertEqual(prefix, 'Pick {a}, {b} or {c}:')
+
+    def test_lenient_without_json5(self):
+        """With json5 missing the lenient fallback warns and gives up."""
+        text = "{'response': 'ok',}"
+        with patch.object(llm_adapters, '_LENIENT_JSON', True), \
+                patch.dict(sys.modules, {'json5': None}), \
+                self.assertLogs('llm_adapters', level='WARNING') as logs:
+            self.assertEqual(_try_parse_json_prefix(text), (None, text))
+        self.assertTrue(any('json5 is not installed' in line for line in logs.output))
+
+    def test_lenient_disabled(self):
+        text = "{'response': 'ok',}"
+        with patch.object(llm_adapters, '_LENIENT_JSON', False), \
+                patch.object(llm_adapters, '_loads_lenient') as loads_lenient, \
+                self.assertLogs('llm_adapters', level='WARNING'):
+            self.assertEqual(_try_parse_json_prefix(text), (None, text))
+        loads_lenient.assert_not_called()
+
+    @unittest.skipIf(importlib.util.find_spec('json5') is None, 'json5 is not installed')
+    def test_lenient_with_json5(self):
+        with patch.object(llm_adapters, '_LENIENT_JSON', True):
+            self.assertEqual(_try_parse_json_prefix("Sure! {'response': 'ok',}"), ({'response': 'ok'}, 'Sure!'))
+
+
+class TestParseResponse(unittest.TestCase):
+    """Test cases for BedrockLlamaResponseParser.parse_response."""
+
+    def setUp(self):
+        self.parser = BedrockLlamaResponseParser()
+
+    def test_clean_object(self):
+        reply = '{"response": "Booked", "UserData": {"destination": "Goa"}}'
+        self.assertEqual(self.parser.parse_response(converse_reply(reply)),
+                         {'response': 'Booked', 'UserData': {'destination': 'Goa'}})
+
+    def test_clean_object_question(self):
+        """An empty question is filled from a response that asks one."""
+        reply = '{"response": "Where to?", "question": ""}'
+        self.assertEqual(self.parser.parse_response(converse_reply(reply)),
+                         {'response': None, 'question': 'Where to?'})
+
+    def test_prose_before_object(self):
+        """The prose is folded into the response, as the text parser always did."""
+        result = self.parser.parse_response(converse_reply('Sure! {"response": "ok"}'))
+        self.assertEqual(result, {'response': 'Sure!ok'})
+
+    def test_stray_braces_before_object(self):
+        reply = 'Use {city} as the key: {"response": "ok", "UserData": {"destination": "Goa"}}'
+        result = self.parser.parse_response(converse_reply(reply))
+        self.assertEqual(result['UserData'], {'destination': 'Goa'})
+        self.assertEqual(result['response'], 'Use {city} as the key:ok')
+
+    def test_unparseable_reply(self):
+        """A reply without valid JSON is kept as plain text."""
+        with self.assertLogs('llm_adapters', level='WARNING'):
+            result = self.parser.parse_response(converse_reply('{"response": "ok",'))
+        self.assertEqual(result, {'response': '{"response": "ok",'})
+
+    def test_plain_text_question(self):
+        result = self.parser.parse_response(converse_reply('  Could you share your email? '))
+        self.assertEqual(result, {'question': 'Could you share your email?'})
+
+    def test_adapter_error_without_output(self):
+        """Error replies from the adapter carry no 'output' and pass through."""
+        error = {'response': "I'm having trouble connecting to the AI service. Please try again later."}
+        self.assertEqual(self.parser.parse_response(error), error)
+
+    def test_dict_without_output_or_response(self):
+        self.assertEqual(self.parser.parse_response({'stopReason': 'end_turn'}), {})
+
+    def test_tool_call_block(self):
+        response = {'output': {'message': {'content': [
+            {'text': '{"response": "Searching"}'},
+            {'tool_call': 'search_flights', 'parameters': {'origin': 'DEL'}},
+        ]}}}
+        self.assertEqual(self.parser.parse_response(response), {
+            'response': 'Searching', 'tool_call': 'search_flights', 'parameters': {'origin': 'DEL'}})
+
+
+if __name__ == "__main__":
+    unittest.main()
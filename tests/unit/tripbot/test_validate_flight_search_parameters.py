@@ -0,0 +1,66 @@
+"""Unit tests for validate_flight_search_parameters."""
+import unittest
+import sys
+import os
+
+# Add src and the tripbot package to the Python path, as gunicorn.conf.py does
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+sys.path.insert(0, os.path.join(project_root, 'src'))
+sys.path.insert(0, os.path.join(project_root, 'src', 'tripbot'))
+
+from routes import validate_flight_search_parameters
+
+
+class TestValidateFlightSearchParameters(unittest.TestCase):
+    """Test cases for the flight search readiness check."""
+
+    def collected(self, departure_date, **overrides):
+        """Collected data with every required field filled in."""
+        data = {
+            'destination': 'Goa',
+            'departure_location': 'Delhi',
+            'departure_date': departure_date,
+            'return_date': '',
+            'trip_type': 'round_trip',
+        }
+        data.update(overrides)
+        return data
+
+    def test_valid_date(self):
+        self.assertTrue(validate_flight_search_parameters(self.collected('2025-12-20')))
+
+    def test_valid_date_range(self):
+        self.assertTrue(validate_flight_search_parameters(self.collected('2025-12-20 to 2025-12-27')))
+
+    def test_one_way_without_return_date(self):
+        """A one-way trip needs no return date."""
+        data = self.collected('2025-12-20', trip_type='one_way')
+        del data['return_date']
+        self.assertTrue(validate_flight_search_parameters(data))
+
+    def test_wrong_shape(self):
+        """Only zero padded YYYY-MM-DD is accepted, including forms fromisoformat allows."""
+        for departure_date in ['2025-1-5', '20251220', '2025-W51-6', '20-12-2025', 'next friday',
+                               '2025-12-20 to 2025-1-5']:
+            with self.subTest(departure_date=departure_date):
+                self.assertFalse(validate_flight_search_parameters(self.collected(departure_date)))
+
+    def test_impossible_date(self):
+        for departure_date in ['2025-02-30', '2025-13-01', '2025-12-20 to 2025-02-30']:
+            with self.subTest(departure_date=departure_date):
+                self.assertFalse(validate_flight_search_parameters(self.collected(departure_date)))
+
+    def test_too_many_range_parts(self):
+        self.assertFalse(validate_flight_search_parameters(
+            self.collected('2025-12-20 to 2025-12-27 to 2025-12-30')))
+
+    def test_missing_required_field(self):
+        for field in ['destination', 'departure_location', 'departure_date']:
+            with self.subTest(field=field):
+                data = self.collected('2025-12-20')
+                data[field] = '  '
+                self.assertFalse(validate_flight_search_parameters(data))
+
+
+if __name__ == "__main__":
+    unittest.main()